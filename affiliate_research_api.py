@@ -15,8 +15,6 @@ import re
 from urllib.parse import urlparse, urlencode
 import aiohttp
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AffiliateOfferResearch:
@@ -623,5 +621,7 @@ def create_affiliate_research_app():
     return app
 
 if __name__ == '__main__':
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(level=logging.INFO)
     app = create_affiliate_research_app()
     app.run(host='0.0.0.0', port=8001, debug=True)
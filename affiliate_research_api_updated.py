@@ -6,7 +6,9 @@ Uses real web search via Linkup API and stores results in Supabase with deduplic
 
 from flask import request, jsonify
 import asyncio
+import copy
 import json
+import threading
 import uuid
 import os
 from datetime import datetime
@@ -14,13 +16,38 @@ from typing import Dict, Any, List, Optional
 import logging
 
 # Import our new Linkup-based research and storage
-from linkup_affiliate_research import linkup_affiliate_research
+from linkup_affiliate_research import LinkupAffiliateResearch, get_linkup_affiliate_research
 from supabase_affiliate_storage_enhanced import EnhancedSupabaseAffiliateStorage
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Recent Linkup searches keyed by (topic, subtopics). Only the raw search result is
+# cached: it isn't user-specific, unlike the stored programs and reuse info that
+# research_affiliate_offers layers on top for each user
+try:
+    from cachetools import TTLCache
+    _LINKUP_SEARCH_CACHE = TTLCache(maxsize=1024, ttl=900)
+except ImportError:
+    _LINKUP_SEARCH_CACHE = None
+_LINKUP_SEARCH_CACHE_LOCK = threading.Lock()
+
+def _get_cached_linkup_search(key):
+    """Return a private copy of a cached Linkup search result, or None"""
+    if _LINKUP_SEARCH_CACHE is None:
+        return None
+    with _LINKUP_SEARCH_CACHE_LOCK:
+        cached = _LINKUP_SEARCH_CACHE.get(key)
+    # Storage and callers annotate the result in place, so never hand out the cached object
+    return copy.deepcopy(cached) if cached is not None else None
+
+def _cache_linkup_search(key, result):
+    """Remember a Linkup search result for later requests"""
+    if _LINKUP_SEARCH_CACHE is None:
+        return
+    snapshot = copy.deepcopy(result)
+    with _LINKUP_SEARCH_CACHE_LOCK:
+        _LINKUP_SEARCH_CACHE[key] = snapshot
+
 # Import user ID extraction from existing code
 def extract_and_validate_user_id(data):
     """Extract and validate user_id from request data"""
@@ -39,9 +66,13 @@ class LinkupAffiliateAPI:
     """API endpoints for Linkup-based affiliate research"""
     
     def __init__(self):
-        self.linkup_research = linkup_affiliate_research
         self.storage = EnhancedSupabaseAffiliateStorage()
     
+    @property
+    def linkup_research(self) -> LinkupAffiliateResearch:
+        """Shared Linkup client, created lazily on first request"""
+        return get_linkup_affiliate_research()
+    
     async def research_affiliate_offers(self, topic: str, user_id: str, 
                                       subtopics: List[str] = None, 
                                       min_commission_threshold: int = 10,
@@ -84,9 +115,21 @@ class LinkupAffiliateAPI:
                             "research_timestamp": datetime.now().isoformat()
                         }
             
-            # Perform new research
-            logger.info(f"Performing new Linkup research for topic: {topic}")
-            research_result = await self.linkup_research.search_affiliate_programs(topic, subtopics)
+            # Perform new research, reusing a recent Linkup search for the same topic
+            search_key = (topic.lower(), tuple(subtopics or ()))
+            research_result = _get_cached_linkup_search(search_key)
+            if research_result is not None:
+                logger.info(f"♻️ Using cached Linkup search for topic: {topic}")
+            else:
+                logger.info(f"Performing new Linkup research for topic: {topic}")
+                try:
+                    research_result = await self.linkup_research.search_affiliate_programs(topic, subtopics)
+                finally:
+                    # Each Flask request runs on its own event loop; release the pooled session with it
+                    await self.linkup_research.close()
+                # Failed subtopic searches only show up as an empty result; don't pin those
+                if research_result.get('programs'):
+                    _cache_linkup_search(search_key, research_result)
             
             # Store results with enhanced reuse strategy
             analysis_id = str(uuid.uuid4())
@@ -541,6 +584,9 @@ def get_affiliate_research_by_analysis():
 affiliate_research = linkup_affiliate_api
 
 if __name__ == "__main__":
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(level=logging.INFO)
+    
     # Test the integration
     import asyncio
     
@@ -2648,17 +2648,14 @@ class BlogIdeaGenerationEngine:
             llm_client = self._initialize_llm_client(llm_config)
             
             # Step 3: Generate ideas from multiple sources (CHANGE TO STEP 4)
-            self.logger.info("💡 Generating ideas from trending topics...")
-            trending_ideas = await self._generate_from_trending_topics(context, llm_client, llm_config)
-            
-            self.logger.info("🎯 Generating ideas from content opportunities...")
-            opportunity_ideas = await self._generate_from_opportunities(context, llm_client, llm_config)
-            
-            self.logger.info("📈 Generating ideas from PyTrends insights...")
-            pytrends_ideas = await self._generate_from_pytrends_data(context, llm_client, llm_config)
-            
-            self.logger.info("🔑 Generating ideas from keyword clusters...")
-            keyword_ideas = await self._generate_from_keyword_clusters(context, llm_client, llm_config)
+            # The four sources are independent, so their LLM calls run concurrently
+            self.logger.info("💡 Generating ideas from trending topics, opportunities, PyTrends and keyword clusters...")
+            trending_ideas, opportunity_ideas, pytrends_ideas, keyword_ideas = await asyncio.gather(
+                self._generate_from_trending_topics(context, llm_client, llm_config),
+                self._generate_from_opportunities(context, llm_client, llm_config),
+                self._generate_from_pytrends_data(context, llm_client, llm_config),
+                self._generate_from_keyword_clusters(context, llm_client, llm_config)
+            )
             
             # Step 4: Combine and deduplicate ideas (CHANGE TO STEP 5)
             all_ideas = trending_ideas + opportunity_ideas + pytrends_ideas + keyword_ideas
@@ -0,0 +1,44 @@
+-- Bulk blog idea updates for PATCH /api/v2/blog-ideas/bulk-update
+-- Run this in Supabase SQL editor
+
+-- Applies a JSON array of per-idea patches in a single UPDATE instead of one
+-- PATCH round trip per idea. Each element carries the idea "id" plus any of the
+-- updateable fields; fields missing from an element keep their current value
+-- (jsonb_populate_record starts from the existing row, which also casts every
+-- value to the column's own type). The column list mirrors _BULK_UPDATEABLE_FIELDS
+-- in phase2_supabase_storage.py; keep them in sync.
+-- Returns the ids of the ideas that were updated.
+CREATE OR REPLACE FUNCTION bulk_update_blog_ideas(p_user_id UUID, p_updates JSONB)
+RETURNS SETOF UUID
+LANGUAGE sql
+SECURITY INVOKER
+AS $$
+    UPDATE blog_ideas AS b
+    SET (
+        selected, priority_level, scheduled_publish_date, notes, title, description,
+        overall_quality_score, viral_potential_score, seo_optimization_score,
+        audience_alignment_score, content_feasibility_score, business_impact_score,
+        keyword_research_enhanced, traffic_potential_score, competition_score,
+        enhanced_primary_keywords, enhanced_secondary_keywords, keyword_research_data,
+        keyword_suggestions, content_optimization_tips, keyword_source_tools,
+        enhancement_timestamp, updated_at
+    ) = (
+        SELECT
+            p.selected, p.priority_level, p.scheduled_publish_date, p.notes, p.title, p.description,
+            p.overall_quality_score, p.viral_potential_score, p.seo_optimization_score,
+            p.audience_alignment_score, p.content_feasibility_score, p.business_impact_score,
+            p.keyword_research_enhanced, p.traffic_potential_score, p.competition_score,
+            p.enhanced_primary_keywords, p.enhanced_secondary_keywords, p.keyword_research_data,
+            p.keyword_suggestions, p.content_optimization_tips, p.keyword_source_tools,
+            p.enhancement_timestamp, p.updated_at
+        FROM jsonb_populate_record(b, u.patch) AS p
+    )
+    FROM jsonb_array_elements(p_updates) AS u(patch)
+    WHERE b.id = (u.patch->>'id')::UUID
+      AND b.user_id = p_user_id
+    RETURNING b.id;
+$$;
+
+GRANT EXECUTE ON FUNCTION bulk_update_blog_ideas(UUID, JSONB) TO authenticated, service_role;
+
+SELECT 'bulk_update_blog_ideas function created' as status;
@@ -253,8 +253,10 @@ def create_enhanced_workflow_api():
     async def download_keyword_csv(analysis_id: str):
         """Download CSV file with keyword suggestions for keyword tools"""
         import os
+        from fastapi.concurrency import run_in_threadpool
         filename = f'enhanced_keywords_{analysis_id}.csv'
-        if os.path.exists(filename):
+        # Stat the file off the event loop so concurrent requests aren't blocked
+        if await run_in_threadpool(os.path.isfile, filename):
             from fastapi.responses import FileResponse
             return FileResponse(
                 filename,
@@ -5,13 +5,15 @@ Fixed timeout issues, improved error handling, and enhanced pytrends integration
 """
 
 import asyncio
+import itertools
 import logging
 import json
 import time
 import re
 import os
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 
 from flask import Flask, request, jsonify, Blueprint
 
@@ -30,6 +32,100 @@ except ImportError:
     except ImportError:
         PYTRENDS_FIXED_AVAILABLE = False
 
+# Process-unique analysis IDs: fixed base + monotonically increasing counter
+_id_base = time.time_ns()
+_id_counter = itertools.count()
+
+def _analysis_id(prefix: str) -> str:
+    """Return a collision-free analysis ID, even for calls within the same second"""
+    return f"{prefix}_{_id_base}_{next(_id_counter)}"
+
+# ============================================================================
+# PROVIDER ADAPTERS
+# ============================================================================
+
+# Providers whose Batch API submit_trend_research_batch can use
+BATCH_PROVIDERS = ('openai', 'anthropic')
+
+KIMI_SYSTEM_PROMPT = "You are Kimi, an AI assistant provided by Moonshot AI. You are proficient in Chinese and English conversations. You provide users with safe, helpful, and accurate answers."
+
+@dataclass(slots=True)
+class ProviderAdapter:
+    """LLM calls pre-bound to one provider's API shape
+    
+    Built once per (provider, model) so the request path calls ``complete``/``stream``
+    directly instead of branching on the provider. The client is passed per call: async
+    clients are bound to the event loop that created them, so adapters must not hold one.
+    """
+    provider: str
+    complete: Callable[[Any, str], Awaitable[str]]
+    stream: Callable[[Any, str, List[str]], Awaitable[str]]
+
+def _build_provider_adapter(provider: str, llm_config: Dict[str, Any]) -> ProviderAdapter:
+    """Create provider-specialized complete/stream closures"""
+    
+    if provider in ('openai', 'kimi'):
+        if provider == 'openai':
+            model = llm_config.get('model', 'gpt-4o-mini')
+            system_messages = []
+            temperature = 0.7
+        else:
+            model = llm_config.get('model', 'kimi-k2-0711-preview')
+            system_messages = [{"role": "system", "content": KIMI_SYSTEM_PROMPT}]
+            temperature = 0.6
+        
+        async def complete(client: Any, prompt: str) -> str:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[*system_messages, {"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=2000,  # Reduced from 3000
+                timeout=30  # 30 second timeout per request
+            )
+            return response.choices[0].message.content
+        
+        async def stream(client: Any, prompt: str, stream_buffer: List[str]) -> str:
+            response_stream = await client.chat.completions.create(
+                model=model,
+                messages=[*system_messages, {"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=2000,
+                timeout=30,
+                stream=True
+            )
+            async for chunk in response_stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    stream_buffer.append(chunk.choices[0].delta.content)
+            return ''.join(stream_buffer)
+        
+    elif provider == 'anthropic':
+        model = llm_config.get('model', 'claude-3-sonnet-20240229')
+        
+        async def complete(client: Any, prompt: str) -> str:
+            response = await client.messages.create(
+                model=model,
+                max_tokens=2000,  # Reduced from 3000
+                messages=[{"role": "user", "content": prompt}],
+                timeout=30  # 30 second timeout per request
+            )
+            return response.content[0].text
+        
+        async def stream(client: Any, prompt: str, stream_buffer: List[str]) -> str:
+            async with client.messages.stream(
+                model=model,
+                max_tokens=2000,
+                messages=[{"role": "user", "content": prompt}],
+                timeout=30
+            ) as response_stream:
+                async for text in response_stream.text_stream:
+                    stream_buffer.append(text)
+            return ''.join(stream_buffer)
+        
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    
+    return ProviderAdapter(provider=provider, complete=complete, stream=stream)
+
 # ============================================================================
 # ENHANCED PROMPTING STRATEGY - SIMPLIFIED AND FASTER
 # ============================================================================
@@ -82,6 +178,8 @@ class EnhancedTrendResearchIntegration:
         self.logger = logging.getLogger(__name__)
         # Initialize enhanced content opportunities generator
         self.opportunities_generator = EnhancedContentOpportunitiesGenerator()
+        # Provider adapters keyed by (provider, model); they hold no client or API key
+        self._adapters: Dict[Tuple[str, Optional[str]], ProviderAdapter] = {}
     
     async def enhanced_trend_research_for_blog_analyzer(
         self,
@@ -209,6 +307,186 @@ class EnhancedTrendResearchIntegration:
             self.logger.error(f"❌ Enhanced trend research failed: {e}")
             return self._fallback_trend_data(topic, target_audience)
 
+    async def submit_trend_research_batch(
+        self,
+        topics: List[str],
+        llm_config: Dict[str, Any],
+        focus_area: str = "general",
+        target_audience: str = "professional"
+    ) -> Dict[str, Any]:
+        """Submit trending-topics prompts for many topics to the provider Batch API
+        
+        Batch jobs cost half as much as realtime calls and do not compete with
+        interactive traffic for rate limits; results arrive within 24h.
+        """
+        
+        provider = llm_config.get('provider', 'openai').lower()
+        if provider not in BATCH_PROVIDERS:
+            raise ValueError(f"Batch mode is not supported for LLM provider: {provider}")
+        
+        llm_client = self._initialize_llm_client(llm_config)
+        custom_ids = {f"trend_{i}": topic for i, topic in enumerate(topics)}
+        
+        self.logger.info(f"📦 Submitting {len(topics)} topics to {provider} Batch API")
+        
+        if provider == 'openai':
+            lines = []
+            for custom_id, topic in custom_ids.items():
+                lines.append(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": llm_config.get('model', 'gpt-4o-mini'),
+                        "messages": [{"role": "user", "content": create_simplified_trending_topics_prompt(topic, focus_area, target_audience)}],
+                        "temperature": 0.7,
+                        "max_tokens": 2000
+                    }
+                }))
+            batch_file = await llm_client.files.create(
+                file=("trend_research_batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = await llm_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            
+        elif provider == 'anthropic':
+            batch = await llm_client.messages.batches.create(requests=[
+                {
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": llm_config.get('model', 'claude-3-sonnet-20240229'),
+                        "max_tokens": 2000,
+                        "messages": [{"role": "user", "content": create_simplified_trending_topics_prompt(topic, focus_area, target_audience)}]
+                    }
+                }
+                for custom_id, topic in custom_ids.items()
+            ])
+        
+        self.logger.info(f"✅ Batch submitted: {batch.id}")
+        return {
+            "batch_id": batch.id,
+            "provider": provider,
+            "custom_ids": custom_ids
+        }
+    
+    async def batch_enhanced_trend_research(
+        self,
+        topics: List[str],
+        collection_name: str,
+        llm_config: Dict[str, Any],
+        focus_area: str = "general",
+        target_audience: str = "professional",
+        poll_interval: float = 30.0
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run trend research for many topics through the Batch API (offline use)
+        
+        Polls until the batch finishes and returns blog analyzer payloads keyed by
+        topic. Content opportunities use the rule-based generator so the whole run
+        makes no realtime LLM calls.
+        """
+        
+        start_time = time.time()
+        submission = await self.submit_trend_research_batch(topics, llm_config, focus_area, target_audience)
+        
+        while True:
+            results = await self.collect_trend_research_batch(
+                submission['batch_id'],
+                submission['custom_ids'],
+                collection_name,
+                llm_config,
+                focus_area,
+                target_audience,
+                start_time=start_time
+            )
+            if results is not None:
+                return results
+            await asyncio.sleep(poll_interval)
+    
+    async def collect_trend_research_batch(
+        self,
+        batch_id: str,
+        custom_ids: Dict[str, str],
+        collection_name: str,
+        llm_config: Dict[str, Any],
+        focus_area: str = "general",
+        target_audience: str = "professional",
+        start_time: Optional[float] = None
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Check a submitted batch once; None while it is still running
+        
+        ``custom_ids`` is the mapping returned by submit_trend_research_batch. Once the
+        batch has ended, returns blog analyzer payloads keyed by topic; topics whose
+        request failed get the fallback trending topics.
+        """
+        
+        provider = llm_config.get('provider', 'openai').lower()
+        if provider not in BATCH_PROVIDERS:
+            raise ValueError(f"Batch mode is not supported for LLM provider: {provider}")
+        
+        llm_client = self._initialize_llm_client(llm_config)
+        responses: Dict[str, str] = {}
+        
+        if provider == 'openai':
+            batch = await llm_client.batches.retrieve(batch_id)
+            if batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+                return None
+            
+            if batch.status != 'completed' or not batch.output_file_id:
+                self.logger.warning(f"⚠️ Batch {batch.id} ended with status: {batch.status}")
+            else:
+                output = await llm_client.files.content(batch.output_file_id)
+                for line in output.text.splitlines():
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    body = (entry.get('response') or {}).get('body') or {}
+                    if body.get('choices'):
+                        responses[entry['custom_id']] = body['choices'][0]['message']['content']
+            
+        else:
+            batch = await llm_client.messages.batches.retrieve(batch_id)
+            if batch.processing_status != 'ended':
+                return None
+            
+            async for entry in await llm_client.messages.batches.results(batch.id):
+                if entry.result.type == 'succeeded':
+                    responses[entry.custom_id] = entry.result.message.content[0].text
+        
+        if start_time is None:
+            start_time = time.time()
+        results = {}
+        for custom_id, topic in custom_ids.items():
+            if custom_id in responses:
+                trending_topics_data = self._parse_trending_topics_response(responses[custom_id], topic)
+            else:
+                trending_topics_data = self._fallback_trending_topics(topic)
+            
+            content_opportunities_data = self.opportunities_generator._create_smart_topic_fallback(
+                topic, trending_topics_data, target_audience
+            )
+            market_intelligence_data = self._generate_market_intelligence_fast(
+                topic, focus_area, trending_topics_data
+            )
+            keyword_intelligence_data = self._get_enhanced_keyword_strategy_fast(
+                topic, trending_topics_data, content_opportunities_data
+            )
+            
+            results[topic] = self._convert_enhanced_data_for_blog_analyzer(
+                trending_topics_data,
+                content_opportunities_data,
+                market_intelligence_data,
+                keyword_intelligence_data,
+                collection_name,
+                time.time() - start_time
+            )
+        
+        self.logger.info(f"✅ Batch trend research completed for {len(results)} topics")
+        return results
+    
     def _ensure_pytrends_data_structure(self, result: Dict[str, Any], topic: str) -> Dict[str, Any]:
         """Ensure PyTrends data structure is present even when analysis fails"""
         
@@ -265,10 +543,13 @@ class EnhancedTrendResearchIntegration:
         # Create simplified prompt
         prompt = create_simplified_trending_topics_prompt(topic, focus_area, target_audience)
         
+        # Streamed tokens land here so a timeout can still salvage complete items
+        stream_buffer: List[str] = []
+        
         # Call LLM with proper timeout
         try:
             response = await asyncio.wait_for(
-                self._call_llm_with_retry(llm_client, prompt, llm_config),
+                self._call_llm_with_retry(llm_client, prompt, llm_config, stream_buffer=stream_buffer),
                 timeout=45  # 45 second timeout
             )
             
@@ -280,6 +561,10 @@ class EnhancedTrendResearchIntegration:
             
         except asyncio.TimeoutError:
             self.logger.error("❌ LLM call timed out for trending topics")
+            partial_items = self._extract_partial_json_items(''.join(stream_buffer))
+            if partial_items:
+                self.logger.info(f"🧩 Recovered {len(partial_items)} trending topics from partial stream")
+                return self._parse_trending_topics_response(json.dumps(partial_items), topic)
             return self._fallback_trending_topics(topic)
         except Exception as e:
             self.logger.error(f"❌ Trending topics analysis failed: {e}")
@@ -441,49 +726,35 @@ class EnhancedTrendResearchIntegration:
             'keyword_clusters': keyword_clusters
         }
     
-    async def _call_llm_with_retry(self, llm_client, prompt: str, llm_config: Dict[str, Any], max_retries: int = 2) -> str:
-        """Call LLM with retry logic and proper timeout handling"""
+    async def _call_llm_with_retry(
+        self,
+        llm_client,
+        prompt: str,
+        llm_config: Dict[str, Any],
+        max_retries: int = 2,
+        stream_buffer: Optional[List[str]] = None
+    ) -> str:
+        """Call LLM with retry logic and proper timeout handling
+        
+        When ``llm_config['stream']`` is set the completion is streamed and each
+        text delta is appended to ``stream_buffer`` as it arrives, so callers can
+        recover partial output if their timeout fires first.
+        """
         
         provider = llm_config.get('provider', 'openai').lower()
+        stream = bool(llm_config.get('stream'))
+        if stream_buffer is None:
+            stream_buffer = []
         
         for attempt in range(max_retries + 1):
             try:
                 self.logger.info(f"🤖 Calling {provider} LLM (attempt {attempt + 1}/{max_retries + 1})")
                 
-                if provider == 'openai':
-                    response = await llm_client.chat.completions.create(
-                        model=llm_config.get('model', 'gpt-4o-mini'),
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.7,
-                        max_tokens=2000,  # Reduced from 3000
-                        timeout=30  # 30 second timeout per request
-                    )
-                    return response.choices[0].message.content
-                    
-                elif provider == 'anthropic':
-                    response = await llm_client.messages.create(
-                        model=llm_config.get('model', 'claude-3-sonnet-20240229'),
-                        max_tokens=2000,  # Reduced from 3000
-                        messages=[{"role": "user", "content": prompt}],
-                        timeout=30  # 30 second timeout per request
-                    )
-                    return response.content[0].text
-                    
-                elif provider == 'kimi':
-                    response = await llm_client.chat.completions.create(
-                        model=llm_config.get('model', 'kimi-k2-0711-preview'),
-                        messages=[
-                            {"role": "system", "content": "You are Kimi, an AI assistant provided by Moonshot AI. You are proficient in Chinese and English conversations. You provide users with safe, helpful, and accurate answers."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.6,
-                        max_tokens=2000,  # Reduced from 3000
-                        timeout=30  # 30 second timeout per request
-                    )
-                    return response.choices[0].message.content
-                    
-                else:
-                    raise ValueError(f"Unsupported LLM provider: {provider}")
+                adapter = self._get_provider_adapter(llm_config)
+                if stream:
+                    stream_buffer.clear()
+                    return await adapter.stream(llm_client, prompt, stream_buffer)
+                return await adapter.complete(llm_client, prompt)
                     
             except Exception as e:
                 self.logger.warning(f"⚠️ {provider} LLM call failed (attempt {attempt + 1}): {e}")
@@ -491,6 +762,45 @@ class EnhancedTrendResearchIntegration:
                     raise
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
     
+    def _get_provider_adapter(self, llm_config: Dict[str, Any]) -> ProviderAdapter:
+        """Return the cached adapter for this provider and model, building it on first use"""
+        
+        provider = llm_config.get('provider', 'openai').lower()
+        key = (provider, llm_config.get('model'))
+        adapter = self._adapters.get(key)
+        
+        if adapter is None:
+            adapter = _build_provider_adapter(provider, llm_config)
+            self._adapters[key] = adapter
+        
+        return adapter
+    
+    def _extract_partial_json_items(self, response: str) -> List[Dict[str, Any]]:
+        """Recover the complete objects from a truncated JSON array"""
+        
+        start = response.find('[')
+        if start == -1:
+            return []
+        
+        decoder = json.JSONDecoder()
+        items = []
+        pos = start + 1
+        length = len(response)
+        
+        while pos < length:
+            # Skip separators between array elements
+            while pos < length and response[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= length or response[pos] != '{':
+                break
+            try:
+                item, pos = decoder.raw_decode(response, pos)
+            except ValueError:
+                break  # Reached the truncated tail
+            items.append(item)
+        
+        return items
+    
     def _parse_trending_topics_response(self, response: str, topic: str) -> List[Dict[str, Any]]:
         """Parse trending topics response with better error handling"""
         
@@ -785,7 +1095,7 @@ class EnhancedTrendResearchIntegration:
             "strategic_intelligence": True,
             "confidence_score": 90,  # Higher confidence due to enhanced analysis
             "data_sources": ["strategic_prompting", "market_intelligence", "audience_analysis"],
-            "analysis_id": f"enhanced_{int(time.time())}",
+            "analysis_id": _analysis_id("enhanced"),
             "processing_time": processing_time,
             "fallback_mode": False,
             
@@ -799,7 +1109,12 @@ class EnhancedTrendResearchIntegration:
         }
     
     def _initialize_llm_client(self, llm_config: Dict[str, Any]):
-        """Initialize LLM client based on provider"""
+        """Initialize LLM client based on provider
+        
+        A new client per call: the integration may be shared across requests, and each
+        async Flask view runs on its own event loop, which the client's connections
+        are tied to. Callers reuse the client for all LLM calls of one run.
+        """
         
         provider = llm_config.get('provider', 'openai').lower()
         api_key = llm_config.get('api_key')
@@ -921,7 +1236,7 @@ class EnhancedTrendResearchIntegration:
             "strategic_intelligence": True,
             "confidence_score": 65,
             "data_sources": ["enhanced_fallback"],
-            "analysis_id": f"enhanced_fallback_{int(time.time())}",
+            "analysis_id": _analysis_id("enhanced_fallback"),
             "processing_time": 2.0,
             "fallback_mode": True
         }
@@ -959,8 +1274,18 @@ def create_enhanced_trend_blueprint(config: Dict[str, Any]) -> Blueprint:
             collection_name = data.get('collection', 'default')
             focus_area = data.get('focus_area', 'general')
             target_audience = data.get('target_audience', 'professional')
+            batch_mode = bool(data.get('batch_mode'))
+            batch_topics = []
+            if batch_mode:
+                topics = data.get('topics', [])
+                if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+                    return jsonify({
+                        "success": False,
+                        "error": "topics must be a list of strings"
+                    }), 400
+                batch_topics = [t.strip() for t in topics if t.strip()]
             
-            if not topic:
+            if not topic and not batch_topics:
                 return jsonify({
                     "success": False,
                     "error": "Topic is required"
@@ -987,6 +1312,27 @@ def create_enhanced_trend_blueprint(config: Dict[str, Any]) -> Blueprint:
             linkup_api_key = data.get('linkup_api_key')
             google_trends_api_key = data.get('google_trends_api_key')
             
+            # Offline runs go through the provider Batch API and return immediately;
+            # results are collected from /enhanced-trend-research/batch/<batch_id>
+            if batch_mode:
+                if provider not in BATCH_PROVIDERS:
+                    return jsonify({
+                        "success": False,
+                        "error": f"Batch mode is not supported for LLM provider: {provider}. Supported: {list(BATCH_PROVIDERS)}"
+                    }), 400
+                batch_info = await trend_integration.submit_trend_research_batch(
+                    topics=batch_topics or [topic],
+                    llm_config=llm_config,
+                    focus_area=focus_area,
+                    target_audience=target_audience
+                )
+                return jsonify({
+                    "success": True,
+                    "batch_mode": True,
+                    **batch_info,
+                    "timestamp": datetime.now().isoformat()
+                }), 202
+            
             # Log request details
             print(f"🔍 Processing request: {topic} ({provider})")
             
@@ -1039,6 +1385,78 @@ def create_enhanced_trend_blueprint(config: Dict[str, Any]) -> Blueprint:
                 "error_type": type(e).__name__
             }), 500
     
+    @bp.route('/enhanced-trend-research/batch/<batch_id>', methods=['POST'])
+    async def enhanced_trend_research_batch_results_endpoint(batch_id):
+        """Collect the results of a batch submitted with batch_mode
+        
+        Takes the ``custom_ids`` returned at submission plus the same llm_config. Returns
+        202 while the batch is still running, then the payloads keyed by topic.
+        """
+        
+        try:
+            data = request.get_json()
+            
+            if not data:
+                return jsonify({
+                    "success": False,
+                    "error": "Request body must be JSON"
+                }), 400
+            
+            custom_ids = data.get('custom_ids')
+            if (not isinstance(custom_ids, dict) or not custom_ids
+                    or not all(isinstance(t, str) for t in custom_ids.values())):
+                return jsonify({
+                    "success": False,
+                    "error": "custom_ids must be the mapping returned when the batch was submitted"
+                }), 400
+            
+            llm_config = data.get('llm_config', {})
+            if not llm_config.get('api_key'):
+                return jsonify({
+                    "success": False,
+                    "error": "LLM API key is required"
+                }), 400
+            
+            provider = llm_config.get('provider', 'openai').lower()
+            if provider not in BATCH_PROVIDERS:
+                return jsonify({
+                    "success": False,
+                    "error": f"Batch mode is not supported for LLM provider: {provider}. Supported: {list(BATCH_PROVIDERS)}"
+                }), 400
+            
+            results = await trend_integration.collect_trend_research_batch(
+                batch_id=batch_id,
+                custom_ids=custom_ids,
+                collection_name=data.get('collection', 'default'),
+                llm_config=llm_config,
+                focus_area=data.get('focus_area', 'general'),
+                target_audience=data.get('target_audience', 'professional')
+            )
+            
+            if results is None:
+                return jsonify({
+                    "success": True,
+                    "batch_id": batch_id,
+                    "status": "in_progress",
+                    "timestamp": datetime.now().isoformat()
+                }), 202
+            
+            return jsonify({
+                "success": True,
+                "batch_id": batch_id,
+                "status": "ended",
+                "trend_research_data": results,
+                "timestamp": datetime.now().isoformat()
+            })
+            
+        except Exception as e:
+            print(f"❌ Batch results endpoint error: {e}")
+            return jsonify({
+                "success": False,
+                "error": f"Batch results failed: {str(e)}",
+                "error_type": type(e).__name__
+            }), 500
+    
     return bp
 
 
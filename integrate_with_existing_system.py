@@ -10,8 +10,6 @@ import logging
 from typing import Dict, Any, List, Optional
 from enhanced_blog_idea_generator import EnhancedBlogIdeaGenerator, KeywordWorkflowManager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SeamlessIntegration:
@@ -104,8 +102,11 @@ class SeamlessIntegration:
         
         return "\n".join(summary_parts)
 
+# Shared instance so the workflow manager and its generators are built once per process
+_SINGLETON: Optional[SeamlessIntegration] = None
+
 # Single function for drop-in replacement
-def create_seamless_integration():
+def create_seamless_integration() -> SeamlessIntegration:
     """
     Create a seamless integration instance
     
@@ -120,8 +121,13 @@ def create_seamless_integration():
         engine = create_seamless_integration()
         result = await engine.generate_blog_ideas_with_automatic_modifiers(...)
         # Same parameters, enhanced results!
+    
+    The instance is created lazily on first use and shared by later callers.
     """
-    return SeamlessIntegration()
+    global _SINGLETON
+    if _SINGLETON is None:
+        _SINGLETON = SeamlessIntegration()
+    return _SINGLETON
 
 # Convenience function for direct usage
 async def run_enhanced_generation(
@@ -157,7 +163,7 @@ def enhance_existing_api():
     Create API endpoints that enhance existing blog idea generation
     """
     
-    from fastapi import FastAPI, HTTPException
+    from fastapi import FastAPI, HTTPException, Query
     from pydantic import BaseModel
     
     app = FastAPI(title="Enhanced Blog Idea API", version="2.0")
@@ -185,12 +191,27 @@ def enhance_existing_api():
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
+    @app.get("/api/v2/keywords/modifier-csv")
+    async def stream_modifier_keyword_csv(keywords: List[str] = Query(...)):
+        """Stream modifier keyword combinations as CSV without building the whole file"""
+        from fastapi.responses import StreamingResponse
+        from keyword_modifier_enhancer import KeywordModifierEnhancer
+        
+        enhancer = KeywordModifierEnhancer()
+        return StreamingResponse(
+            enhancer.iter_csv_lines(keywords),
+            media_type='text/csv',
+            headers={'Content-Disposition': 'attachment; filename="modifier_keywords.csv"'}
+        )
+    
     @app.get("/api/v2/blog-ideas/{analysis_id}/keywords")
     async def get_keyword_csv(analysis_id: str):
         """Download keyword CSV for external tools"""
         import os
+        from fastapi.concurrency import run_in_threadpool
         filename = f'enhanced_keywords_{analysis_id}.csv'
-        if os.path.exists(filename):
+        # Stat the file off the event loop so concurrent requests aren't blocked
+        if await run_in_threadpool(os.path.isfile, filename):
             from fastapi.responses import FileResponse
             return FileResponse(
                 filename,
@@ -277,4 +298,6 @@ async def main():
     print("3. CSV files are automatically generated for keyword tools")
 
 if __name__ == "__main__":
+    # Configure logging only when run as a script, not on import
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
\ No newline at end of file
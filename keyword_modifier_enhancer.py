@@ -4,12 +4,17 @@ Keyword Modifier Enhancement System
 Extends keyword research by adding non-niche specific modifier words to increase search volume opportunities
 """
 
+import csv
+import functools
+import heapq
+import io
 import logging
-from typing import Dict, Any, List, Set
+import operator
+import re
+from typing import Dict, Any, Iterator, List, Set, Tuple
 from dataclasses import dataclass
-from keyword_research_api import generate_keyword_suggestions  # Import from existing system
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class KeywordModifier:
     """Represents a keyword modifier category"""
     category: str
@@ -20,6 +25,82 @@ class KeywordModifier:
 class KeywordModifierEnhancer:
     """Enhances keywords with non-niche specific modifier words"""
     
+    # Keyword combination patterns; all distinct, so no dedup is needed
+    _PATTERN_TEMPLATES = (
+        "{b} {m}",
+        "{m} for {b}",
+        "enterprise {b} {m}",
+        "{b} {m} system",
+        "{b} {m} solution",
+        "advanced {b} {m}",
+        "{b} {m} integration",
+        "{b} {m} optimization"
+    )
+    
+    # Volume multipliers based on patterns (context-aware)
+    _VOL_MULT = {
+        "implementation": 1.8,
+        "methodology": 1.7,
+        "framework": 1.6,
+        "system": 1.5,
+        "solution": 1.4,
+        "enterprise": 1.9,
+        "integration": 1.6,
+        "optimization": 1.7,
+        "platform": 1.5,
+        "deployment": 1.8
+    }
+    _VOL_RE = re.compile("|".join(_VOL_MULT))
+    
+    # Content type by keyword fragment; earlier entries take priority
+    _CONTENT_MAPPING = {
+        "calculator": "interactive_tool",
+        "tool": "interactive_tool",
+        "software": "enterprise_solution",
+        "platform": "enterprise_platform",
+        "system": "integrated_system",
+        "solution": "enterprise_solution",
+        "framework": "implementation_framework",
+        "methodology": "implementation_methodology",
+        "template": "implementation_template",
+        "workflow": "process_workflow",
+        "integration": "system_integration",
+        "deployment": "enterprise_deployment",
+        "implementation": "strategic_implementation",
+        "architecture": "enterprise_architecture",
+        "consultation": "strategic_consultation",
+        "coaching": "executive_coaching",
+        "training": "professional_training",
+        "course": "professional_course",
+        "workshop": "strategy_workshop",
+        "service": "enterprise_service",
+        "analysis": "strategic_analysis",
+        "strategy": "business_strategy",
+        "optimization": "performance_optimization",
+        "planning": "strategic_planning",
+        "management": "enterprise_management",
+        "organization": "organizational_design",
+        "scheduling": "project_scheduling",
+        "budget": "resource_planning",
+        "forecast": "business_forecasting"
+    }
+    _CT_RANK = {key: rank for rank, key in enumerate(_CONTENT_MAPPING)}
+    # Lookahead so findall reports every fragment occurrence, even overlapping ones
+    _CT_RE = re.compile("(?=(" + "|".join(re.escape(key) for key in _CONTENT_MAPPING) + "))")
+    
+    # Competition indicators, matched as whole words
+    _HIGH_COMPETITION = frozenset({"best", "top", "review", "comparison", "2025"})
+    _MEDIUM_COMPETITION = frozenset({"guide", "tips", "tool", "software"})
+    _LOW_COMPETITION = frozenset({"free", "template", "checklist", "planner"})
+    _WORD_RE = re.compile(r"\w+")
+    
+    # Default content type based on intent
+    _INTENT_CONTENT_TYPES = {
+        "informational": "blog_post",
+        "commercial": "product_review",
+        "transactional": "product_page"
+    }
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
@@ -119,6 +200,21 @@ class KeywordModifierEnhancer:
                 use_case="Installation and configuration guidance"
             )
         }
+        
+        # Flat (category, modifier, intent, use_case) table for the hot loops
+        self._flat_modifiers = [
+            (category_name, modifier, modifier_obj.intent, modifier_obj.use_case)
+            for category_name, modifier_obj in self.modifier_categories.items()
+            for modifier in modifier_obj.modifiers
+        ]
+        self._num_categories = len(self.modifier_categories)
+        
+        # (template, multiplier from its fixed words, spaces in the template); placeholders are
+        # always space-delimited, so a template's own words never combine with the filled-in text
+        self._template_weights = [
+            (template, self._fragment_multiplier(template.format(b="", m="")), template.count(" "))
+            for template in self._PATTERN_TEMPLATES
+        ]
     
     def enhance_keywords_with_modifiers(self, base_keywords: List[str], 
                                       target_audience: str = "professional",
@@ -166,79 +262,72 @@ class KeywordModifierEnhancer:
     def _generate_modifier_combinations(self, base_keyword: str, max_combinations: int) -> List[Dict[str, Any]]:
         """Generate modifier combinations for a single base keyword"""
         
-        combinations = []
+        limit = max_combinations * self._num_categories
+        clean_keyword = base_keyword.strip()
         
-        for category_name, modifier_obj in self.modifier_categories.items():
-            for modifier in modifier_obj.modifiers:
-                # Generate different combination patterns
-                patterns = self._create_combination_patterns(base_keyword, modifier)
-                
-                for pattern in patterns:
-                    if len(combinations) >= max_combinations * len(self.modifier_categories):
-                        break
-                        
-                    combination = {
-                        "original_keyword": base_keyword,
-                        "enhanced_keyword": pattern,
-                        "modifier": modifier,
-                        "modifier_category": category_name,
-                        "search_intent": modifier_obj.intent,
-                        "use_case": modifier_obj.use_case,
-                        "estimated_search_volume": self._estimate_volume(pattern),
-                        "competition_level": self._estimate_competition(pattern),
-                        "content_type": self._suggest_content_type(pattern, modifier_obj.intent)
-                    }
-                    
-                    combinations.append(combination)
+        base_multiplier = self._fragment_multiplier(clean_keyword)
+        base_spaces = clean_keyword.count(" ")
         
-        # Sort by estimated volume and relevance
-        combinations.sort(key=lambda x: x["estimated_search_volume"], reverse=True)
-        return combinations[:max_combinations * len(self.modifier_categories)]
-    
-    def _create_combination_patterns(self, base_keyword: str, modifier: str) -> List[str]:
-        """Create different keyword combination patterns"""
-        
-        patterns = [
-            f"{base_keyword} {modifier}",
-            f"{modifier} for {base_keyword}",
-            f"enterprise {base_keyword} {modifier}",
-            f"{base_keyword} {modifier} system",
-            f"{base_keyword} {modifier} solution",
-            f"advanced {base_keyword} {modifier}",
-            f"{base_keyword} {modifier} integration",
-            f"{base_keyword} {modifier} optimization"
+        # Score every pattern as a lightweight tuple; only the top ones become dicts.
+        # Same result as _estimate_volume(pattern) without re-scanning the template words
+        candidates = [
+            (
+                self._scale_volume(
+                    max(template_multiplier, base_multiplier, self._fragment_multiplier(modifier)),
+                    template_spaces + base_spaces + modifier.count(" ") + 1
+                ),
+                template.format(b=clean_keyword, m=modifier),
+                modifier, category_name, intent, use_case
+            )
+            for category_name, modifier, intent, use_case in self._flat_modifiers
+            for template, template_multiplier, template_spaces in self._template_weights
         ]
         
-        # Remove duplicates and clean up
-        patterns = list(set(patterns))
-        return [p.strip() for p in patterns if p.strip()]
+        # Highest estimated volume first
+        top = heapq.nlargest(limit, candidates, key=operator.itemgetter(0))
+        
+        return [
+            {
+                "original_keyword": base_keyword,
+                "enhanced_keyword": pattern,
+                "modifier": modifier,
+                "modifier_category": category_name,
+                "search_intent": intent,
+                "use_case": use_case,
+                "estimated_search_volume": volume,
+                "competition_level": self._estimate_competition(pattern),
+                "content_type": self._suggest_content_type(pattern, intent)
+            }
+            for volume, pattern, modifier, category_name, intent, use_case in top
+        ]
     
-    def _estimate_volume(self, keyword: str) -> int:
+    # The estimators below depend only on their arguments and class tables,
+    # so results are memoized across keywords and instances
+    @classmethod
+    @functools.lru_cache(maxsize=65536)
+    def _estimate_volume(cls, keyword: str) -> int:
         """Estimate search volume for enhanced keyword (simplified estimation)"""
         
-        base_volume = 100  # Base assumption
+        return cls._scale_volume(cls._fragment_multiplier(keyword), keyword.count(" ") + 1)
+    
+    @classmethod
+    @functools.lru_cache(maxsize=65536)
+    def _fragment_multiplier(cls, text: str) -> float:
+        """Strongest volume multiplier among the patterns found in text"""
         
-        # Volume multipliers based on patterns (context-aware)
-        volume_multipliers = {
-            "implementation": 1.8,
-            "methodology": 1.7,
-            "framework": 1.6,
-            "system": 1.5,
-            "solution": 1.4,
-            "enterprise": 1.9,
-            "integration": 1.6,
-            "optimization": 1.7,
-            "platform": 1.5,
-            "deployment": 1.8
-        }
+        # Single regex pass; the strongest matching pattern wins
+        return max(
+            (cls._VOL_MULT[match] for match in cls._VOL_RE.findall(text.lower())),
+            default=1.0
+        )
+    
+    @staticmethod
+    def _scale_volume(multiplier: float, word_count: int) -> int:
+        """Apply the long-tail length adjustment to a volume multiplier"""
         
-        multiplier = 1.0
-        for pattern, mult in volume_multipliers.items():
-            if pattern in keyword.lower():
-                multiplier = max(multiplier, mult)
+        base_volume = 100  # Base assumption
         
         # Adjust based on keyword length (long-tail usually lower volume)
-        word_count = len(keyword.split())
         if word_count > 5:
             multiplier *= 0.7
         elif word_count > 3:
@@ -246,121 +335,92 @@ class KeywordModifierEnhancer:
             
         return int(base_volume * multiplier)
     
-    def _estimate_competition(self, keyword: str) -> str:
+    @classmethod
+    @functools.lru_cache(maxsize=65536)
+    def _estimate_competition(cls, keyword: str) -> str:
         """Estimate competition level for enhanced keyword"""
         
-        # Competition indicators
-        high_competition_words = ["best", "top", "review", "comparison", "2025"]
-        medium_competition_words = ["guide", "tips", "tool", "software"]
-        low_competition_words = ["free", "template", "checklist", "planner"]
-        
-        keyword_lower = keyword.lower()
+        # Tokenize once; hyphenated modifiers split into their words
+        tokens = set(cls._WORD_RE.findall(keyword.lower()))
         
         # Check for competition indicators
-        if any(word in keyword_lower for word in high_competition_words):
+        if not cls._HIGH_COMPETITION.isdisjoint(tokens):
             return "high"
-        elif any(word in keyword_lower for word in medium_competition_words):
+        elif not cls._MEDIUM_COMPETITION.isdisjoint(tokens):
             return "medium"
-        elif any(word in keyword_lower for word in low_competition_words):
+        elif not cls._LOW_COMPETITION.isdisjoint(tokens):
             return "low"
         else:
             return "medium"
     
-    def _suggest_content_type(self, keyword: str, intent: str) -> str:
+    @classmethod
+    @functools.lru_cache(maxsize=65536)
+    def _suggest_content_type(cls, keyword: str, intent: str) -> str:
         """Suggest content type based on keyword and intent"""
         
-        keyword_lower = keyword.lower()
+        matches = cls._CT_RE.findall(keyword.lower())
+        if matches:
+            # Same priority as scanning _CONTENT_MAPPING in order
+            return cls._CONTENT_MAPPING[min(matches, key=cls._CT_RANK.__getitem__)]
         
-        content_mapping = {
-            "calculator": "interactive_tool",
-            "tool": "interactive_tool",
-            "software": "enterprise_solution",
-            "platform": "enterprise_platform",
-            "system": "integrated_system",
-            "solution": "enterprise_solution",
-            "framework": "implementation_framework",
-            "methodology": "implementation_methodology",
-            "template": "implementation_template",
-            "workflow": "process_workflow",
-            "integration": "system_integration",
-            "deployment": "enterprise_deployment",
-            "implementation": "strategic_implementation",
-            "architecture": "enterprise_architecture",
-            "consultation": "strategic_consultation",
-            "coaching": "executive_coaching",
-            "training": "professional_training",
-            "course": "professional_course",
-            "workshop": "strategy_workshop",
-            "service": "enterprise_service",
-            "analysis": "strategic_analysis",
-            "strategy": "business_strategy",
-            "optimization": "performance_optimization",
-            "planning": "strategic_planning",
-            "management": "enterprise_management",
-            "organization": "organizational_design",
-            "scheduling": "project_scheduling",
-            "budget": "resource_planning",
-            "forecast": "business_forecasting"
-        }
+        return cls._INTENT_CONTENT_TYPES.get(intent, "blog_post")
+    
+    def generate_tool_specific_keywords(self, tool_name: str, base_keywords: List[str]) -> List[str]:
+        """Generate tool-specific keyword lists for Ahrefs, SEMrush, etc.
         
-        for key, content_type in content_mapping.items():
-            if key in keyword_lower:
-                return content_type
+        The list does not depend on tool_name; it is kept for API compatibility.
+        """
         
-        # Default based on intent
-        intent_mapping = {
-            "informational": "blog_post",
-            "commercial": "product_review",
-            "transactional": "product_page"
-        }
+        # Deduplicate while generating instead of materializing every combination first
+        tool_keywords: Set[str] = set()
+        
+        for base_keyword in base_keywords:
+            for _, modifier, _, _ in self._flat_modifiers:
+                # Create search-friendly combinations
+                tool_keywords.add(f"{base_keyword} {modifier}")
+                tool_keywords.add(f"{modifier} {base_keyword}")
+                tool_keywords.add(f"best {base_keyword} {modifier}")
+                tool_keywords.add(f"{base_keyword} {modifier} 2025")
         
-        return intent_mapping.get(intent, "blog_post")
+        return sorted(tool_keywords)
     
-    def generate_tool_specific_keywords(self, tool_name: str, base_keywords: List[str]) -> List[str]:
-        """Generate tool-specific keyword lists for Ahrefs, SEMrush, etc."""
+    CSV_HEADERS = ("Keyword", "Category", "Intent", "Use Case", "Content Type")
+    
+    def iter_csv_rows(self, base_keywords: List[str]) -> Iterator[Tuple[str, ...]]:
+        """Yield the header and one row per base keyword/modifier pair"""
         
-        tool_keywords = []
+        yield self.CSV_HEADERS
         
         for base_keyword in base_keywords:
-            for category_name, modifier_obj in self.modifier_categories.items():
-                for modifier in modifier_obj.modifiers:
-                    # Create search-friendly combinations
-                    combinations = [
-                        f"{base_keyword} {modifier}",
-                        f"{modifier} {base_keyword}",
-                        f"best {base_keyword} {modifier}",
-                        f"{base_keyword} {modifier} 2025"
-                    ]
-                    
-                    tool_keywords.extend(combinations)
+            for category_name, modifier, intent, use_case in self._flat_modifiers:
+                enhanced_keyword = f"{base_keyword} {modifier}"
+                yield (
+                    enhanced_keyword,
+                    category_name,
+                    intent,
+                    use_case,
+                    self._suggest_content_type(enhanced_keyword, intent)
+                )
+    
+    def iter_csv_lines(self, base_keywords: List[str]) -> Iterator[str]:
+        """Yield properly quoted CSV lines one at a time (for streaming responses)"""
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
         
-        # Remove duplicates and return
-        unique_keywords = list(set(tool_keywords))
-        return sorted(unique_keywords)
+        for row in self.iter_csv_rows(base_keywords):
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
     
     def create_csv_export_for_tools(self, base_keywords: List[str]) -> str:
         """Create CSV export for direct import into keyword tools"""
         
-        rows = []
-        headers = ["Keyword", "Category", "Intent", "Use Case", "Content Type"]
-        rows.append(",".join(headers))
-        
-        for base_keyword in base_keywords:
-            for category_name, modifier_obj in self.modifier_categories.items():
-                for modifier in modifier_obj.modifiers:
-                    enhanced_keyword = f"{base_keyword} {modifier}"
-                    content_type = self._suggest_content_type(enhanced_keyword, modifier_obj.intent)
-                    
-                    row = [
-                        f'"{enhanced_keyword}"',
-                        f'"{category_name}"',
-                        f'"{modifier_obj.intent}"',
-                        f'"{modifier_obj.use_case}"',
-                        f'"{content_type}"'
-                    ]
-                    rows.append(",".join(row))
-        
-        return "\n".join(rows)
+        buffer = io.StringIO()
+        # One C-level writerows pass over all rows, header included
+        csv.writer(buffer, lineterminator="\n").writerows(self.iter_csv_rows(base_keywords))
+        return buffer.getvalue()
 
 def integrate_with_existing_system(base_keywords: List[str], 
                                  existing_keywords: List[str] = None) -> Dict[str, Any]:
@@ -380,23 +440,23 @@ def integrate_with_existing_system(base_keywords: List[str],
     # Generate enhanced combinations
     enhanced_data = enhancer.enhance_keywords_with_modifiers(base_keywords)
     
-    # Generate tool-specific exports
-    ahrefs_keywords = enhancer.generate_tool_specific_keywords("ahrefs", base_keywords)
-    semrush_keywords = enhancer.generate_tool_specific_keywords("semrush", base_keywords)
-    moz_keywords = enhancer.generate_tool_specific_keywords("moz", base_keywords)
+    # Generate tool-specific exports (the keyword list is the same for every tool)
+    tool_keywords = enhancer.generate_tool_specific_keywords("ahrefs", base_keywords)
     
     # Create CSV export
     csv_export = enhancer.create_csv_export_for_tools(base_keywords)
     
+    existing_set = set(existing_keywords or ())
+    
     return {
         "enhanced_keywords": enhanced_data,
         "tool_specific_exports": {
-            "ahrefs": ahrefs_keywords,
-            "semrush": semrush_keywords,
-            "moz": moz_keywords
+            "ahrefs": tool_keywords,
+            "semrush": list(tool_keywords),
+            "moz": list(tool_keywords)
         },
         "csv_export": csv_export,
-        "total_new_opportunities": len([kw for kw in ahrefs_keywords if not existing_keywords or kw not in existing_keywords])
+        "total_new_opportunities": sum(1 for kw in tool_keywords if kw not in existing_set)
     }
 
 # Example usage
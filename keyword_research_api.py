@@ -4,98 +4,126 @@ Keyword Research API Integration for Noodl Server
 Extends the existing noodl_server.py with manual keyword research functionality
 """
 
-from typing import Dict, Any, List
+import functools
+from typing import Dict, Any, List, Tuple
 
 # Import the manual keyword research system
 from manual_keyword_integration import ManualKeywordResearchIntegration, KeywordData
 
-def generate_keyword_suggestions(base_keywords: List[str], topic: str, target_audience: str) -> Dict[str, List[str]]:
-    """Generate additional keyword suggestions"""
+# Suggestion templates per category; {t} is a base term
+_CATEGORY_TEMPLATES = {
+    "informational_keywords": (
+        "what is {t}",
+        "{t} methodology",
+        "{t} implementation process",
+        "how to implement {t}",
+        "{t} optimization techniques",
+        "{t} strategic approach"
+    ),
+    "commercial_keywords": (
+        "enterprise {t}",
+        "{t} platform",
+        "{t} solution",
+        "{t} system",
+        "{t} infrastructure",
+        "{t} deployment"
+    ),
+    "long_tail_keywords": (
+        "{t} implementation workflow",
+        "{t} enterprise deployment",
+        "{t} strategic framework",
+        "{t} integration methodology",
+        "{t} optimization process"
+    ),
+    "question_keywords": (
+        "how does {t} work",
+        "why use {t}",
+        "when to use {t}",
+        "what are {t} benefits"
+    ),
+    "comparison_keywords": (
+        "{t} vs alternatives",
+        "{t} pros and cons",
+        "difference between {t}"
+    ),
+    "location_based_keywords": ()
+}
+
+# Extra informational templates for specific audiences (applied to the top 3 terms)
+_AUDIENCE_TEMPLATES = {
+    "small_business": (
+        "{t} workflow optimization",
+        "{t} resource planning",
+        "{t} implementation strategy"
+    ),
+    "enterprise": (
+        "enterprise {t} architecture",
+        "{t} enterprise integration",
+        "{t} organizational deployment"
+    )
+}
+
+MAX_SUGGESTIONS_PER_CATEGORY = 10
+MAX_BASE_TERMS = 5
+
+# Common words never used as base terms
+_STOPWORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+    'with', 'by', 'how', 'what', 'when', 'where', 'why', 'who'
+})
+
+def _extract_base_terms(base_keywords: List[str], topic: str) -> List[str]:
+    """First unique meaningful words from the keywords then the topic, in order of appearance"""
     
-    suggestions = {
-        "informational_keywords": [],
-        "commercial_keywords": [], 
-        "long_tail_keywords": [],
-        "question_keywords": [],
-        "comparison_keywords": [],
-        "location_based_keywords": []
-    }
+    terms: List[str] = []
+    seen = set()
+    for source in (*base_keywords, topic or ''):
+        for token in source.lower().split():
+            if len(token) > 2 and token not in _STOPWORDS and token not in seen:
+                seen.add(token)
+                terms.append(token)
+                if len(terms) == MAX_BASE_TERMS:
+                    return terms
+    return terms
+
+def _fill_suggestions(found: Dict[str, None], templates, terms: List[str]) -> None:
+    """Add unique formatted suggestions to found (ordered) until the category cap is reached"""
     
-    # Base terms from keywords and topic
-    base_terms = set()
-    for keyword in base_keywords:
-        base_terms.update(keyword.lower().split())
-    if topic:
-        base_terms.update(topic.lower().split())
+    for term in terms:
+        for template in templates:
+            if len(found) >= MAX_SUGGESTIONS_PER_CATEGORY:
+                return
+            found[template.format(t=term)] = None
+
+def generate_keyword_suggestions(base_keywords: List[str], topic: str, target_audience: str) -> Dict[str, List[str]]:
+    """Generate additional keyword suggestions"""
     
-    # Remove common words
-    common_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'how', 'what', 'when', 'where', 'why', 'who'}
-    base_terms = [term for term in base_terms if term not in common_words and len(term) > 2]
+    # Terms are lowercased anyway, so normalize the cache key the same way; keep keyword order
+    cached = _cached_keyword_suggestions(
+        tuple(keyword.lower() for keyword in base_keywords),
+        (topic or '').lower(),
+        target_audience or ''
+    )
     
-    # Generate suggestions
-    for term in base_terms[:5]:  # Limit to top 5 terms
-        # Informational
-        suggestions["informational_keywords"].extend([
-            f"what is {term}",
-            f"{term} methodology",
-            f"{term} implementation process",
-            f"how to implement {term}",
-            f"{term} optimization techniques",
-            f"{term} strategic approach"
-        ])
-        
-        # Commercial
-        suggestions["commercial_keywords"].extend([
-            f"enterprise {term}",
-            f"{term} platform",
-            f"{term} solution",
-            f"{term} system",
-            f"{term} infrastructure",
-            f"{term} deployment"
-        ])
-        
-        # Long-tail
-        suggestions["long_tail_keywords"].extend([
-            f"{term} implementation workflow",
-            f"{term} enterprise deployment", 
-            f"{term} strategic framework",
-            f"{term} integration methodology",
-            f"{term} optimization process"
-        ])
-        
-        # Questions
-        suggestions["question_keywords"].extend([
-            f"how does {term} work",
-            f"why use {term}",
-            f"when to use {term}",
-            f"what are {term} benefits"
-        ])
-        
-        # Comparisons
-        suggestions["comparison_keywords"].extend([
-            f"{term} vs alternatives",
-            f"{term} pros and cons",
-            f"difference between {term}"
-        ])
+    # Copy the lists so callers can't mutate the cached result
+    return {category: list(keywords) for category, keywords in cached.items()}
+
+@functools.lru_cache(maxsize=1024)
+def _cached_keyword_suggestions(base_keywords: Tuple[str, ...], topic: str, target_audience: str) -> Dict[str, List[str]]:
+    """Suggestion generation for normalized inputs (memoized)"""
     
-    # Audience-specific suggestions
-    if target_audience == 'small_business':
-        for term in base_terms[:3]:
-            suggestions["informational_keywords"].extend([
-                f"{term} workflow optimization",
-                f"{term} resource planning",
-                f"{term} implementation strategy"
-            ])
-    elif target_audience == 'enterprise':
-        for term in base_terms[:3]:
-            suggestions["informational_keywords"].extend([
-                f"enterprise {term} architecture",
-                f"{term} enterprise integration",
-                f"{term} organizational deployment"
-            ])
+    # Base terms from keywords and topic (top 5, common words removed)
+    base_terms = _extract_base_terms(base_keywords, topic)
+    audience_templates = _AUDIENCE_TEMPLATES.get(target_audience, ())
     
-    # Remove duplicates and limit results
-    for category in suggestions:
-        suggestions[category] = list(set(suggestions[category]))[:10]
+    # Generate only as many unique suggestions as each category keeps
+    suggestions = {}
+    for category, templates in _CATEGORY_TEMPLATES.items():
+        found: Dict[str, None] = {}
+        if category == "informational_keywords":
+            # Audience-specific suggestions go first so the cap doesn't crowd them out
+            _fill_suggestions(found, audience_templates, base_terms[:3])
+        _fill_suggestions(found, templates, base_terms)
+        suggestions[category] = list(found)
     
-    return suggestions
\ No newline at end of file
+    return suggestions
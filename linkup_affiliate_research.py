@@ -6,22 +6,133 @@ Uses Linkup API to search for real affiliate opportunities
 
 import asyncio
 import aiohttp
+import functools
 import json
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import logging
 import hashlib
+import re
+import threading
+import weakref
 from urllib.parse import urlparse
 import os
 from dotenv import load_dotenv
 
+# orjson parses the large raw-content payloads much faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Commission patterns, tried in order against lowercased content
+_COMMISSION_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(\d+(?:\.\d+)?)%\s*commission',
+    r'commission\s*:\s*\$?(\d+(?:\.\d+)?)',
+    r'(\d+(?:\.\d+)?)%\s*per\s*(?:sale|conversion)',
+    r'earn\s*\$?(\d+(?:\.\d+)?)\s*(?:per|for each)',
+    r'(\d+(?:\.\d+)?)%\s*rev\s*share'
+)]
+
+# Cookie duration patterns, tried in order against lowercased content
+_COOKIE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(\d+(?:\.\d+)?)\s*(?:day|days)\s*cookie',
+    r'cookie\s*duration\s*:?\s*(\d+(?:\.\d+)?)\s*(?:day|days)',
+    r'(\d+(?:\.\d+)?)\s*day\s*tracking'
+)]
+
+# Promotional material keywords as one alternation; the group name is the material type.
+# Wrapped in a lookahead so overlapping keywords ("email creative" also contains
+# "creative") are each reported, matching the old independent substring checks
+_PROMO_RE = re.compile(
+    r'(?=(?P<banners>banner|creative|graphic)'
+    r'|(?P<text_links>text ?link)'
+    r'|(?P<email_templates>email template|email creative)'
+    r'|(?P<social_media_kit>social media|social creative)'
+    r'|(?P<product_feeds>product feed|data feed))'
+)
+
+# URL fragment -> affiliate network; earlier entries take priority
+_NETWORK_MAPPING = {
+    'amazon': 'amazon',
+    'shareasale': 'shareasale',
+    'clickbank': 'clickbank',
+    'cj.com': 'cj',
+    'impact.com': 'impact',
+    'rakuten': 'rakuten',
+    'partnerize': 'partnerize',
+    'refersion': 'refersion',
+    'impactradius': 'impact'
+}
+_NETWORK_RANK = {key: rank for rank, key in enumerate(_NETWORK_MAPPING)}
+# Lookahead so one scan reports every fragment occurrence, even overlapping ones
+_NETWORK_RE = re.compile('(?=(' + '|'.join(map(re.escape, _NETWORK_MAPPING)) + '))')
+
+# First line (stripped length 11-99) that mentions a program/affiliate/partner
+_TITLE_LINE_RE = re.compile(
+    r'^[^\S\n]*(?=[^\n]*?(?:program|affiliate|partner))(\S[^\n]{9,97}\S)[^\S\n]*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+@dataclass(slots=True)
+class AffiliateProgram:
+    """Affiliate program extracted from a Linkup search result"""
+    id: str
+    network: str
+    program_name: str
+    description: str
+    commission_rate: float
+    commission_amount: float
+    cookie_duration: str
+    program_url: str
+    subtopic: str
+    approval_required: bool
+    promotional_materials: List[str]
+    extraction_confidence: float
+    source_url: str
+    extracted_at: str
+    unique_id: Optional[str] = None  # Set for programs kept by deduplication
+    
+    def to_dict(self) -> Dict[str, Any]:
+        program = {
+            'id': self.id,
+            'network': self.network,
+            'program_name': self.program_name,
+            'description': self.description,
+            'commission_rate': self.commission_rate,
+            'commission_amount': self.commission_amount,
+            'cookie_duration': self.cookie_duration,
+            'program_url': self.program_url,
+            'subtopic': self.subtopic,
+            'approval_required': self.approval_required,
+            'promotional_materials': self.promotional_materials,
+            'extraction_confidence': self.extraction_confidence,
+            'source_url': self.source_url,
+            'extracted_at': self.extracted_at
+        }
+        if self.unique_id is not None:
+            program['unique_id'] = self.unique_id
+        return program
+
+def _dumps_json(obj: Any) -> str:
+    """Serialize request bodies (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+async def _read_json(response: aiohttp.ClientResponse) -> Any:
+    """Parse a JSON response body straight from bytes (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(await response.read())
+    return await response.json()
+
 class LinkupAffiliateResearch:
     """Real affiliate research using Linkup API"""
     
@@ -40,6 +151,43 @@ class LinkupAffiliateResearch:
             'Content-Type': 'application/json'
         }
         
+        # Pooled HTTP sessions (connection pool + keep-alive), one per event loop. The instance
+        # is shared process-wide and every Flask request runs on its own loop, so concurrent
+        # requests must not swap each other's session; entries go away with their loop
+        self._sessions = weakref.WeakKeyDictionary()
+        self._sessions_lock = threading.Lock()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the running loop's pooled session, creating it on first use"""
+        
+        loop = asyncio.get_running_loop()
+        with self._sessions_lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    headers=self.headers,
+                    # Every request goes to the Linkup host; cap per-host sockets so concurrent
+                    # subtopic searches reuse warm connections rather than opening new ones
+                    connector=aiohttp.TCPConnector(
+                        limit=20, limit_per_host=3, ttl_dns_cache=300, keepalive_timeout=60
+                    ),
+                    timeout=aiohttp.ClientTimeout(total=30),
+                    json_serialize=_dumps_json
+                )
+                self._sessions[loop] = session
+        return session
+    
+    async def close(self):
+        """Close the running loop's session; call before that event loop shuts down
+        
+        Sessions owned by other loops are left alone; they may still be in use.
+        """
+        
+        with self._sessions_lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+        
     async def search_affiliate_programs(self, topic: str, subtopics: List[str] = None) -> Dict[str, Any]:
         """Search for real affiliate programs using Linkup"""
         
@@ -47,21 +195,21 @@ class LinkupAffiliateResearch:
             subtopics = await self._generate_subtopics_from_linkup(topic)
         
         all_programs = []
-        search_results = []
-        
-        for subtopic in subtopics[:5]:  # Limit to 5 subtopics to avoid rate limits
-            try:
-                programs = await self._search_single_subtopic(subtopic)
-                if programs:
-                    all_programs.extend(programs)
-                    search_results.append({
-                        'subtopic': subtopic,
-                        'programs_found': len(programs),
-                        'programs': programs
-                    })
-            except Exception as e:
-                logger.error(f"Error searching for {subtopic}: {e}")
+        found_by_subtopic = []
+        
+        selected_subtopics = subtopics[:5]  # Limit to 5 subtopics to avoid rate limits
+        
+        # One extraction timestamp for every program found in this search
+        batch_timestamp = datetime.now().isoformat()
+        results = await self._search_many_subtopics(selected_subtopics, batch_timestamp)
+        
+        for subtopic, programs in zip(selected_subtopics, results):
+            if isinstance(programs, Exception):
+                logger.error(f"Error searching for {subtopic}: {programs}")
                 continue
+            if programs:
+                all_programs.extend(programs)
+                found_by_subtopic.append((subtopic, programs))
         
         # Deduplicate programs based on unique identifiers
         unique_programs = self._deduplicate_programs(all_programs)
@@ -69,10 +217,21 @@ class LinkupAffiliateResearch:
         # Generate profitability analysis
         profitability_analysis = self._analyze_profitability(unique_programs, subtopics)
         
+        # Serialize each program once; the per-subtopic results share the same dicts
+        program_dicts = {id(program): program.to_dict() for program in all_programs}
+        search_results = [
+            {
+                'subtopic': subtopic,
+                'programs_found': len(programs),
+                'programs': [program_dicts[id(program)] for program in programs]
+            }
+            for subtopic, programs in found_by_subtopic
+        ]
+        
         return {
             'topic': topic,
             'subtopics': subtopics,
-            'programs': unique_programs,
+            'programs': [program_dicts[id(program)] for program in unique_programs],
             'total_programs': len(unique_programs),
             'search_results': search_results,
             'profitability_analysis': profitability_analysis,
@@ -80,7 +239,26 @@ class LinkupAffiliateResearch:
             'source': 'linkup_api'
         }
     
-    async def _search_single_subtopic(self, subtopic: str) -> List[Dict[str, Any]]:
+    async def _search_many_subtopics(self, subtopics: List[str], extracted_at: Optional[str] = None) -> List[Any]:
+        """Search several subtopics over the shared session; one result (or exception) per subtopic
+        
+        Linkup has no multi-query search endpoint, so the searches are issued concurrently
+        and multiplexed over the session's pooled keep-alive connections instead.
+        """
+        
+        # At most 3 requests in flight to stay within rate limits
+        semaphore = asyncio.Semaphore(3)
+        
+        async def search_with_limit(subtopic: str) -> List[AffiliateProgram]:
+            async with semaphore:
+                return await self._search_single_subtopic(subtopic, extracted_at)
+        
+        return await asyncio.gather(
+            *(search_with_limit(subtopic) for subtopic in subtopics),
+            return_exceptions=True
+        )
+    
+    async def _search_single_subtopic(self, subtopic: str, extracted_at: Optional[str] = None) -> List[AffiliateProgram]:
         """Search for affiliate programs for a single subtopic"""
         
         search_query = f"{subtopic} affiliate program"
@@ -93,22 +271,18 @@ class LinkupAffiliateResearch:
             "maxResults": 5  # Reduced to avoid rate limits
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/search",
-                headers=self.headers,
-                json=payload
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._parse_affiliate_programs(data, subtopic)
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Linkup API error: {response.status} - {error_text}")
-                    logger.error(f"Request URL: {response.url}")
-                    logger.error(f"Headers: {self.headers}")
-                    logger.error(f"Payload: {payload}")
-                    return []
+        session = await self._get_session()
+        async with session.post(f"{self.base_url}/search", json=payload) as response:
+            if response.status == 200:
+                data = await _read_json(response)
+                return self._parse_affiliate_programs(data, subtopic, extracted_at)
+            else:
+                error_text = await response.text()
+                logger.error(f"Linkup API error: {response.status} - {error_text}")
+                logger.error(f"Request URL: {response.url}")
+                logger.error(f"Headers: {self.headers}")
+                logger.error(f"Payload: {payload}")
+                return []
     
     async def _generate_subtopics_from_linkup(self, topic: str) -> List[str]:
         """Generate subtopics using Linkup search"""
@@ -122,20 +296,17 @@ class LinkupAffiliateResearch:
             "maxResults": 5
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/search",
-                headers=self.headers,
-                json=payload
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return self._extract_subtopics_from_results(data, topic)
-                else:
-                    # Fallback to basic subtopics
-                    return [f"{topic} tools", f"{topic} courses", f"{topic} software"]
+        session = await self._get_session()
+        async with session.post(f"{self.base_url}/search", json=payload) as response:
+            if response.status == 200:
+                data = await _read_json(response)
+                return self._extract_subtopics_from_results(data, topic)
+            else:
+                # Fallback to basic subtopics
+                return [f"{topic} tools", f"{topic} courses", f"{topic} software"]
     
-    def _parse_affiliate_programs(self, search_data: Dict[str, Any], subtopic: str) -> List[Dict[str, Any]]:
+    def _parse_affiliate_programs(self, search_data: Dict[str, Any], subtopic: str,
+                                  extracted_at: Optional[str] = None) -> List[AffiliateProgram]:
         """Parse Linkup search results for affiliate programs"""
         
         programs = []
@@ -143,36 +314,30 @@ class LinkupAffiliateResearch:
         if not search_data.get('results'):
             return programs
         
+        extracted_at = extracted_at or datetime.now().isoformat()
+        
         for result in search_data['results']:
             content = result.get('content', '') + ' ' + result.get('raw_content', '')
             
             # Extract affiliate program information
-            program_data = self._extract_program_info(content, result, subtopic)
+            program_data = self._extract_program_info(content, result, subtopic, extracted_at)
             if program_data:
                 programs.append(program_data)
         
         return programs
     
-    def _extract_program_info(self, content: str, result: Dict[str, Any], subtopic: str) -> Optional[Dict[str, Any]]:
+    def _extract_program_info(self, content: str, result: Dict[str, Any], subtopic: str,
+                              extracted_at: str) -> Optional[AffiliateProgram]:
         """Extract structured affiliate program information from search content"""
         
         content_lower = content.lower()
         
         # Look for commission patterns
-        commission_patterns = [
-            r'(\d+(?:\.\d+)?)%\s*commission',
-            r'commission\s*:\s*\$?(\d+(?:\.\d+)?)',
-            r'(\d+(?:\.\d+)?)%\s*per\s*(?:sale|conversion)',
-            r'earn\s*\$?(\d+(?:\.\d+)?)\s*(?:per|for each)',
-            r'(\d+(?:\.\d+)?)%\s*rev\s*share'
-        ]
-        
         commission_rate = None
         commission_amount = None
         
-        for pattern in commission_patterns:
-            import re
-            match = re.search(pattern, content_lower)
+        for pattern in _COMMISSION_PATTERNS:
+            match = pattern.search(content_lower)
             if match:
                 value = float(match.group(1))
                 if value <= 100:  # Likely percentage
@@ -182,15 +347,9 @@ class LinkupAffiliateResearch:
                 break
         
         # Look for cookie duration
-        cookie_patterns = [
-            r'(\d+(?:\.\d+)?)\s*(?:day|days)\s*cookie',
-            r'cookie\s*duration\s*:?\s*(\d+(?:\.\d+)?)\s*(?:day|days)',
-            r'(\d+(?:\.\d+)?)\s*day\s*tracking'
-        ]
-        
         cookie_duration = None
-        for pattern in cookie_patterns:
-            match = re.search(pattern, content_lower)
+        for pattern in _COOKIE_PATTERNS:
+            match = pattern.search(content_lower)
             if match:
                 cookie_duration = f"{match.group(1)} days"
                 break
@@ -209,12 +368,9 @@ class LinkupAffiliateResearch:
             # Try to extract from content if available
             if content and len(content) > 20:
                 # Look for potential program names in content
-                lines = content.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if len(line) > 10 and len(line) < 100 and any(keyword in line.lower() for keyword in ['program', 'affiliate', 'partner']):
-                        title = line[:60].strip()
-                        break
+                match = _TITLE_LINE_RE.search(content)
+                if match:
+                    title = match.group(1)[:60].strip()
         
         # If still empty, use fallback
         if not title or title.strip() in ['...', '']:
@@ -224,72 +380,50 @@ class LinkupAffiliateResearch:
         network = self._identify_network(url)
         
         # Don't skip if commission data exists, even if it's 0 - let the user see all programs
-        return {
-            'id': self._generate_program_id(title, url),
-            'network': network,
-            'program_name': title,
-            'description': str(result.get('description', content[:200]))[:500] or f"Affiliate program for {subtopic}",
-            'commission_rate': float(commission_rate or 0),
-            'commission_amount': float(commission_amount or 0),
-            'cookie_duration': str(cookie_duration or '30 days'),
-            'program_url': str(url),
-            'subtopic': str(subtopic),
-            'approval_required': bool('approval' in content_lower or 'apply' in content_lower),
-            'promotional_materials': self._detect_promotional_materials(content_lower),
-            'extraction_confidence': float(self._calculate_confidence(content, commission_rate, cookie_duration)),
-            'source_url': str(url),
-            'extracted_at': str(datetime.now().isoformat())
-        }
+        return AffiliateProgram(
+            id=self._generate_program_id(title, url),
+            network=network,
+            program_name=title,
+            description=str(result.get('description', content[:200]))[:500] or f"Affiliate program for {subtopic}",
+            commission_rate=float(commission_rate or 0),
+            commission_amount=float(commission_amount or 0),
+            cookie_duration=str(cookie_duration or '30 days'),
+            program_url=str(url),
+            subtopic=str(subtopic),
+            approval_required=bool('approval' in content_lower or 'apply' in content_lower),
+            promotional_materials=self._detect_promotional_materials(content_lower),
+            extraction_confidence=float(self._calculate_confidence(content_lower, commission_rate, cookie_duration)),
+            source_url=str(url),
+            extracted_at=extracted_at
+        )
     
     def _identify_network(self, url: str) -> str:
         """Identify affiliate network from URL"""
-        url_lower = url.lower()
-        network_mapping = {
-            'amazon': 'amazon',
-            'shareasale': 'shareasale',
-            'clickbank': 'clickbank',
-            'cj.com': 'cj',
-            'impact.com': 'impact',
-            'rakuten': 'rakuten',
-            'partnerize': 'partnerize',
-            'refersion': 'refersion',
-            'impactradius': 'impact'
-        }
-        
-        for key, network in network_mapping.items():
-            if key in url_lower:
-                return network
+        matches = _NETWORK_RE.findall(url.lower())
+        if matches:
+            # Same priority as checking _NETWORK_MAPPING in order
+            return _NETWORK_MAPPING[min(matches, key=_NETWORK_RANK.__getitem__)]
         
         return 'other'
     
     def _detect_promotional_materials(self, content: str) -> List[str]:
         """Detect available promotional materials"""
-        materials = []
-        
-        if any(word in content for word in ['banner', 'creative', 'graphic']):
-            materials.append('banners')
-        if any(word in content for word in ['text link', 'textlink']):
-            materials.append('text_links')
-        if any(word in content for word in ['email template', 'email creative']):
-            materials.append('email_templates')
-        if any(word in content for word in ['social media', 'social creative']):
-            materials.append('social_media_kit')
-        if any(word in content for word in ['product feed', 'data feed']):
-            materials.append('product_feeds')
-        
-        return materials
+        found = {match.lastgroup for match in _PROMO_RE.finditer(content)}
+        
+        # Report in the fixed group order rather than first-seen order
+        return [name for name in _PROMO_RE.groupindex if name in found]
     
-    def _calculate_confidence(self, content: str, commission_rate, cookie_duration) -> float:
-        """Calculate confidence score for extracted information"""
+    def _calculate_confidence(self, content_lower: str, commission_rate, cookie_duration) -> float:
+        """Calculate confidence score for extracted information (expects lowercased content)"""
         confidence = 0.0
         
         if commission_rate:
             confidence += 0.4
         if cookie_duration:
             confidence += 0.3
-        if any(word in content.lower() for word in ['affiliate', 'partner', 'commission']):
+        if any(word in content_lower for word in ['affiliate', 'partner', 'commission']):
             confidence += 0.2
-        if len(content) > 200:
+        if len(content_lower) > 200:
             confidence += 0.1
         
         return min(confidence, 1.0)
@@ -317,19 +451,22 @@ class LinkupAffiliateResearch:
         # Use patterns as fallback
         return patterns[:6]
     
-    def _deduplicate_programs(self, programs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _deduplicate_programs(self, programs: List[AffiliateProgram]) -> List[AffiliateProgram]:
         """Remove duplicate programs based on unique identifiers"""
         seen = set()
         unique_programs = []
         
         for program in programs:
-            # Create unique identifier
-            identifier = f"{program.get('network', '')}_{program.get('program_name', '')}"
-            identifier_hash = hashlib.md5(identifier.encode()).hexdigest()
+            # Deduplicate on the raw (network, name) pair; only kept programs get a hashed ID
+            network = program.network
+            program_name = program.program_name
+            identifier = (network, program_name)
             
-            if identifier_hash not in seen:
-                seen.add(identifier_hash)
-                program['unique_id'] = identifier_hash
+            if identifier not in seen:
+                seen.add(identifier)
+                program.unique_id = hashlib.blake2b(
+                    f"{network}_{program_name}".encode(), digest_size=16
+                ).hexdigest()
                 unique_programs.append(program)
         
         return unique_programs
@@ -337,9 +474,9 @@ class LinkupAffiliateResearch:
     def _generate_program_id(self, title: str, url: str) -> str:
         """Generate unique program ID from title and URL"""
         identifier = f"{title}_{url}"
-        return hashlib.md5(identifier.encode()).hexdigest()[:16]
+        return hashlib.blake2b(identifier.encode(), digest_size=8).hexdigest()
 
-    def _analyze_profitability(self, programs: List[Dict[str, Any]], subtopics: List[str]) -> Dict[str, Any]:
+    def _analyze_profitability(self, programs: List[AffiliateProgram], subtopics: List[str]) -> Dict[str, Any]:
         """Analyze overall profitability of affiliate programs"""
         
         if not programs:
@@ -354,12 +491,24 @@ class LinkupAffiliateResearch:
                 'networks_represented': 0
             }
         
-        # Calculate metrics
+        # Calculate metrics in a single pass over the programs
         total_programs = len(programs)
-        avg_commission_rate = sum(float(p.get('commission_rate', 0)) for p in programs) / total_programs
-        avg_commission_amount = sum(float(p.get('commission_amount', 0)) for p in programs) / total_programs
-        high_value_programs = len([p for p in programs if float(p.get('commission_rate', 0)) >= 20])
-        networks_represented = len(set(p.get('network', '') for p in programs))
+        rate_sum = 0.0
+        amount_sum = 0.0
+        high_value_programs = 0
+        networks = set()
+        
+        for p in programs:
+            rate = p.commission_rate
+            rate_sum += rate
+            amount_sum += p.commission_amount
+            if rate >= 20:
+                high_value_programs += 1
+            networks.add(p.network)
+        
+        avg_commission_rate = rate_sum / total_programs
+        avg_commission_amount = amount_sum / total_programs
+        networks_represented = len(networks)
         
         # Scoring system
         score = 0
@@ -397,5 +546,8 @@ class LinkupAffiliateResearch:
             'subtopics_covered': len(subtopics)
         }
 
-# Global instance
-linkup_affiliate_research = LinkupAffiliateResearch()
\ No newline at end of file
+# Shared instance, created on first use rather than at import time
+@functools.cache
+def get_linkup_affiliate_research() -> LinkupAffiliateResearch:
+    """Return the process-wide LinkupAffiliateResearch instance"""
+    return LinkupAffiliateResearch()
\ No newline at end of file
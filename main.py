@@ -4,14 +4,26 @@ Updated noodl_server.py with RLS support and user_id handling
 Compatible with Noodl authentication approach
 """
 from typing import Dict, Any, List, Optional
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, copy_current_request_context, g, request, jsonify, send_file
 from flask_cors import CORS
 import asyncio
+import atexit
+import concurrent.futures
+import copy
+import functools
+import gzip
+import hashlib
 import os
+import re
 import sys
 import logging
+import logging.handlers
+import queue
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta
+from urllib.parse import urlencode
 from blog_idea_generator import BlogIdeaGenerationEngine
 from phase2_supabase_storage import Phase2SupabaseStorage
 # Import the RLS-compatible Supabase integration
@@ -29,21 +41,398 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
+# Serialize JSON responses with orjson when it is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """orjson-backed JSON provider with the same output conventions as Flask's default"""
+
+        def dumps(self, obj, **kwargs):
+            # Dates still go through Flask's default hook so they keep the HTTP date format
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+
+# Compress large JSON and text responses for clients that accept it; Brotli when installed
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Bodies smaller than this aren't worth the compression time
+_COMPRESS_MIN_SIZE = 1024
+
+@app.after_request
+def _compress_response(response):
+    """gzip/Brotli-encode buffered JSON and text bodies; streams and files pass through"""
+    mimetype = response.mimetype or ''
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+            or not (mimetype == 'application/json' or mimetype.startswith('text/'))):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < _COMPRESS_MIN_SIZE:
+        return response
+    
+    accepted = request.accept_encodings
+    if BROTLI_AVAILABLE and accepted['br']:
+        response.set_data(brotli.compress(body, quality=4))
+        encoding = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(body, compresslevel=5))
+        encoding = 'gzip'
+    else:
+        return response
+    response.headers['Content-Encoding'] = encoding
+    
+    # A strong ETag names exact bytes, so each content-coding needs its own (RFC 9110 8.8.3)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
 # Register affiliate research blueprint
 from affiliate_research_api_updated import affiliate_bp
 app.register_blueprint(affiliate_bp)
 
-# Configure logging
+# Research backends for the enhanced trend endpoint, resolved once at startup
+try:
+    from fixed_trend_research import TrendResearchIntegration
+    TREND_RESEARCH_IMPORT_ERROR = None
+except ImportError:
+    try:
+        # Fallback to original
+        from trend_research_integration import TrendResearchIntegration
+        TREND_RESEARCH_IMPORT_ERROR = None
+        print("⚠️ Using original trend_research_integration.py (not the fixed version)")
+    except ImportError as e:
+        TrendResearchIntegration = None
+        TREND_RESEARCH_IMPORT_ERROR = e
+
+# Linkup-based affiliate research
+try:
+    from affiliate_research_api_updated import linkup_affiliate_api as affiliate_research
+    AFFILIATE_RESEARCH_AVAILABLE = True
+except ImportError:
+    affiliate_research = None
+    AFFILIATE_RESEARCH_AVAILABLE = False
+
+# Affiliate research storage (connects to Supabase on import)
+try:
+    from supabase_affiliate_storage import affiliate_storage
+    AFFILIATE_STORAGE_IMPORT_ERROR = None
+except Exception as e:
+    affiliate_storage = None
+    AFFILIATE_STORAGE_IMPORT_ERROR = e
+
+class _DeferredFormatQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves traceback formatting to the listener thread
+    
+    The stock handler formats the whole record, stack walk included, on the
+    request thread. Only the message is merged here; exc_info travels with the
+    record and the listener's formatter renders it.
+    """
+    
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+# Configure logging. Request threads only enqueue records; a listener thread formats
+# and writes them, so error bursts don't hold up responses or serialize requests on
+# the stderr lock.
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+# force=True: modules imported above may already have configured the root logger
 logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    handlers=[_DeferredFormatQueueHandler(_log_queue)],
+    force=True
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def _postgrest_query(filters, *params):
+    """Encode PostgREST filter and option pairs into one query string
+    
+    Values are percent-encoded, so user-supplied filter values can't inject extra
+    parameters; commas and '*' stay readable in select lists.
+    """
+    return urlencode([*filters, *params], safe=',*')
+
+# Response timestamps only need one-second resolution; format each second once
+_now_iso_cache = (0, '')
+
+def _now_iso():
+    """Current local time as an ISO string, truncated to the second"""
+    global _now_iso_cache
+    second = int(time.time())
+    cached_second, cached = _now_iso_cache
+    if second != cached_second:
+        cached = datetime.fromtimestamp(second).isoformat()
+        _now_iso_cache = (second, cached)
+    return cached
+
+def _rows_etag(rows, *extra):
+    """Short ETag for a list of rows, from each row's id, change timestamp and selection
+    
+    ``extra`` covers anything else the response depends on (query string, date...).
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in extra:
+        digest.update(f"{part}\0".encode())
+    for row in rows:
+        digest.update(f"{row.get('id')}|{row.get('updated_at') or row.get('created_at')}|{row.get('selected')}\0".encode())
+    return digest.hexdigest()
+
+def _not_modified_response(etag):
+    """304 response if the client already holds this ETag, else None
+    
+    _compress_response suffixes the ETag of compressed bodies with their encoding,
+    so the encoded variants match too.
+    """
+    for tag in (etag, f"{etag}-br", f"{etag}-gzip"):
+        if request.if_none_match.contains(tag):
+            response = _with_etag(Response(status=304), tag)
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
+
+def _with_etag(response, etag):
+    # no-cache: clients may keep the body but must revalidate, so selection toggles show up at once
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+# Sync views run coroutines on one event loop per worker thread instead of a new loop per request
+_thread_state = threading.local()
+
+def _run_async(coro):
+    """Run a coroutine to completion on this thread's persistent event loop"""
+    loop = getattr(_thread_state, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _thread_state.loop = loop
+    return loop.run_until_complete(coro)
+
+def _close_thread_loop():
+    """Close this thread's event loop from _run_async; the next call creates a fresh one"""
+    loop = getattr(_thread_state, 'loop', None)
+    if loop is None or loop.is_closed():
+        return
+    try:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+        _thread_state.loop = None
+
+@functools.lru_cache(maxsize=1)
+def _get_storage():
+    """Shared RLS Supabase storage; user context is passed explicitly on every query"""
+    return ImprovedSupabaseStorage()
+
+@functools.lru_cache(maxsize=1)
+def _get_phase2_storage():
+    """Shared Phase 2 storage; like _get_storage, every query carries its user_id"""
+    return Phase2SupabaseStorage()
+
+@functools.lru_cache(maxsize=1)
+def _get_blog_engine():
+    """Shared blog idea generation engine; it only holds configuration constants"""
+    return BlogIdeaGenerationEngine()
+
+# Recent trend analysis lists keyed by (user_id, limit); Noodl polls the same list
+# repeatedly, and new analyses from this server invalidate the user's entries
+try:
+    from cachetools import TTLCache
+    _TREND_ANALYSES_CACHE = TTLCache(maxsize=1024, ttl=30)
+except ImportError:
+    _TREND_ANALYSES_CACHE = None
+_TREND_ANALYSES_CACHE_LOCK = threading.Lock()
+
+def _get_cached_trend_analyses(user_id, limit):
+    """Return the cached enhanced analyses list for a user, or None"""
+    if _TREND_ANALYSES_CACHE is None:
+        return None
+    with _TREND_ANALYSES_CACHE_LOCK:
+        return _TREND_ANALYSES_CACHE.get((user_id, limit))
+
+def _cache_trend_analyses(user_id, limit, analyses):
+    if _TREND_ANALYSES_CACHE is None:
+        return
+    with _TREND_ANALYSES_CACHE_LOCK:
+        _TREND_ANALYSES_CACHE[(user_id, limit)] = analyses
+
+def _invalidate_trend_analyses(user_id):
+    """Drop every cached list for a user after their analyses change"""
+    if _TREND_ANALYSES_CACHE is None:
+        return
+    with _TREND_ANALYSES_CACHE_LOCK:
+        for key in [key for key in _TREND_ANALYSES_CACHE if key[0] == user_id]:
+            _TREND_ANALYSES_CACHE.pop(key, None)
+
+# Encoded bodies of the blog-idea read endpoints keyed by (user_id, path, query string).
+# The UI polls them, and every blog idea write from this server drops the user's entries;
+# the short TTL bounds staleness from writes made elsewhere.
+try:
+    from cachetools import TTLCache
+    _BLOG_READ_CACHE = TTLCache(maxsize=4096, ttl=15)
+except ImportError:
+    _BLOG_READ_CACHE = None
+_BLOG_READ_CACHE_LOCK = threading.Lock()
+
+def _cached_blog_read(view):
+    """Serve a user-scoped GET view from _BLOG_READ_CACHE; only 200 responses are stored
+    
+    Must sit below @app.route on views listed in _QUERY_USER_ID_ENDPOINTS, which set g.user_id.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if _BLOG_READ_CACHE is None:
+            return view(*args, **kwargs)
+        
+        key = (g.user_id, request.path, request.query_string)
+        with _BLOG_READ_CACHE_LOCK:
+            cached = _BLOG_READ_CACHE.get(key)
+        if cached is not None:
+            body, mimetype = cached
+            return Response(body, mimetype=mimetype)
+        
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            with _BLOG_READ_CACHE_LOCK:
+                _BLOG_READ_CACHE[key] = (response.get_data(), response.mimetype)
+        return response
+    return wrapper
+
+def _invalidate_blog_reads(user_id):
+    """Drop every cached blog-idea read for a user after their blog ideas change"""
+    if _BLOG_READ_CACHE is None:
+        return
+    with _BLOG_READ_CACHE_LOCK:
+        for key in [key for key in _BLOG_READ_CACHE if key[0] == user_id]:
+            _BLOG_READ_CACHE.pop(key, None)
+
+# Recent blog idea generations keyed by a digest of everything that shapes the prompts,
+# so a repeated "generate" click returns the saved result instead of another LLM run
+try:
+    from cachetools import TTLCache
+    _BLOG_GENERATION_CACHE = TTLCache(maxsize=256, ttl=3600)
+except ImportError:
+    _BLOG_GENERATION_CACHE = None
+_BLOG_GENERATION_CACHE_LOCK = threading.Lock()
+
+def _blog_generation_cache_key(analysis_id, user_id, llm_config, generation_config, linkup_enabled):
+    """Digest of a generation request and the user's current Phase 1 selections, or None"""
+    if _BLOG_GENERATION_CACHE is None:
+        return None
+    
+    # Selections change the prompts, so they are part of the key
+    supabase_storage = _get_storage()
+    selected = []
+    for table in ('trending_topics', 'content_opportunities'):
+        endpoint = f"{table}?" + _postgrest_query(
+            [('trend_analysis_id', f'eq.{analysis_id}'), ('user_id', f'eq.{user_id}'), ('selected', 'eq.true')],
+            ('select', 'id'), ('order', 'id')
+        )
+        response = supabase_storage._execute_query('GET', endpoint)
+        if not response['success']:
+            return None
+        selected.append([row['id'] for row in response['data']])
+    
+    key_material = json.dumps({
+        "analysis_id": analysis_id,
+        "user_id": user_id,
+        "llm_config": {k: v for k, v in llm_config.items() if k != 'api_key'},
+        "generation_config": generation_config,
+        "linkup_enabled": linkup_enabled,
+        "selected": selected
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(key_material.encode()).hexdigest()
+
+def _get_cached_blog_generation(key):
+    """Return a private copy of a cached generation result, or None"""
+    if _BLOG_GENERATION_CACHE is None or key is None:
+        return None
+    with _BLOG_GENERATION_CACHE_LOCK:
+        cached = _BLOG_GENERATION_CACHE.get(key)
+    return copy.deepcopy(cached) if cached is not None else None
+
+def _cache_blog_generation(key, result):
+    if _BLOG_GENERATION_CACHE is None or key is None:
+        return
+    snapshot = copy.deepcopy(result)
+    with _BLOG_GENERATION_CACHE_LOCK:
+        _BLOG_GENERATION_CACHE[key] = snapshot
+
+# Generations currently running, by cache key. A request identical to one in flight (a
+# double click, a client retry) waits for that run instead of starting its own. Views run
+# on per-request event loops, so these are thread-safe concurrent futures.
+_INFLIGHT_GENERATIONS = {}
+_INFLIGHT_GENERATIONS_LOCK = threading.Lock()
+
+def _join_inflight_generation(key):
+    """Return (future, is_owner); the owner runs the generation and must settle the future"""
+    with _INFLIGHT_GENERATIONS_LOCK:
+        future = _INFLIGHT_GENERATIONS.get(key)
+        if future is not None:
+            return future, False
+        future = _INFLIGHT_GENERATIONS[key] = concurrent.futures.Future()
+        return future, True
+
+def _settle_inflight_generation(key, future, result=None, error=None):
+    with _INFLIGHT_GENERATIONS_LOCK:
+        _INFLIGHT_GENERATIONS.pop(key, None)
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# Canonical hyphenated UUID; other spellings uuid.UUID accepts are checked the slow way
+_UUID_RE = re.compile(r'\A[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z')
+
+def _is_valid_uuid(value):
+    """True if value parses as a UUID"""
+    if isinstance(value, str) and _UUID_RE.match(value):
+        return True
+    try:
+        uuid.UUID(value)
+        return True
+    except (ValueError, TypeError, AttributeError):
+        return False
+
 def extract_and_validate_user_id(data):
     """Helper function to extract and validate user_id from request data"""
     user_id = data.get('user_id') if data else None
@@ -52,17 +441,145 @@ def extract_and_validate_user_id(data):
         return None, {"success": False, "error": "user_id is required"}, 400
     
     # Validate UUID format
-    try:
-        uuid.UUID(user_id)
+    if _is_valid_uuid(user_id):
         return user_id, None, None
-    except ValueError:
-        return None, {"success": False, "error": "Invalid user_id format. Must be a valid UUID."}, 400
+    return None, {"success": False, "error": "Invalid user_id format. Must be a valid UUID."}, 400
+
+# Longest topic the trend research endpoint accepts (after trimming whitespace)
+_MAX_TOPIC_LENGTH = 500
+
+# LLM providers accepted by the analysis endpoints (message keeps the list order)
+_SUPPORTED_PROVIDERS_ORDER = ('openai', 'anthropic', 'deepseek', 'gemini', 'kimi')
+_SUPPORTED_PROVIDERS = frozenset(_SUPPORTED_PROVIDERS_ORDER)
+_SUPPORTED_PROVIDERS_MSG = f"Supported: {list(_SUPPORTED_PROVIDERS_ORDER)}"
+
+# Advice attached to affiliate results whose profitability score is below the threshold
+_PROFITABILITY_SUGGESTIONS = (
+    "Try more specific subtopics (e.g., 'smart home security cameras' instead of 'home security')",
+    "Explore related high-commission niches (e.g., 'home automation systems', 'security software')",
+    "Consider seasonal trends - holiday security sales spike in Q4",
+    "Focus on high-ticket items like complete security systems vs individual sensors",
+    "Research B2B opportunities - commercial security systems have higher commissions",
+    "Look for subscription-based security services with recurring commissions",
+    "Expand to related categories: insurance, home improvement, smart home hubs",
+    "Check for high-commission software/tools used in security industry"
+)
+
+class AnalysisTimeoutError(Exception):
+    """A trend analysis or blog idea generation ran past its time limit"""
+    http_status = 408  # Request Timeout
+
+# Error-message keywords mapped to HTTP status, checked in order (anything else is a 500);
+# only consulted for exceptions that don't carry an ``http_status`` of their own
+_ERROR_STATUS_KEYWORDS = (
+    ("timeout", 408),    # Request Timeout
+    ("api key", 401),    # Unauthorized
+    ("user_id", 400),    # Bad Request
+    ("uuid", 400),
+    ("not found", 404),  # Not Found
+)
+
+# Blog idea generation reports missing or foreign analyses as 403
+_BLOG_ERROR_STATUS_KEYWORDS = (
+    ("timeout", 408),        # Request Timeout
+    ("api key", 401),        # Unauthorized
+    ("access denied", 403),  # Forbidden
+    ("not found", 403),
+    ("user_id", 400),        # Bad Request
+    ("uuid", 400),
+)
+
+# Troubleshooting hints returned with every failed analysis
+_TROUBLESHOOTING = {
+    "common_causes": [
+        "Invalid or missing API key",
+        "Invalid or missing user_id",
+        "Network connectivity issues",
+        "LLM service unavailable",
+        "Topic too broad or complex"
+    ],
+    "suggested_actions": [
+        "Verify your API key is correct and active",
+        "Ensure user_id is a valid UUID from Noodl authentication",
+        "Try a more specific topic",
+        "Check your internet connection",
+        "Wait a moment and try again"
+    ]
+}
+
+# Troubleshooting hints returned with every failed blog idea generation
+_BLOG_TROUBLESHOOTING = {
+    "common_causes": [
+        "Invalid analysis ID or user access denied",
+        "Phase 1 analysis not completed or no selections made",
+        "Invalid or missing LLM API key",
+        "Linkup API key invalid or rate limited",
+        "Network connectivity issues"
+    ],
+    "suggested_actions": [
+        "Verify Phase 1 analysis completed successfully",
+        "Ensure trending topics and opportunities are selected",
+        "Check LLM API key is correct and active",
+        "Verify Linkup API key if using research enhancement",
+        "Try again with a different LLM provider"
+    ]
+}
+
+def _status_for_error(e, keywords=_ERROR_STATUS_KEYWORDS):
+    """Pick the HTTP status for a failure: its own ``http_status``, else from its message"""
+    status = getattr(e, 'http_status', None)
+    if status is not None:
+        return status
+    message = str(e).lower()
+    return next((code for keyword, code in keywords if keyword in message), 500)
+
+def _analysis_error_response(e):
+    """Build the JSON error response for a failed analysis"""
+    return jsonify({
+        "success": False,
+        "error": f"Analysis failed: {str(e)}",
+        "error_type": type(e).__name__,
+        "troubleshooting": _TROUBLESHOOTING
+    }), _status_for_error(e)
+
+# List members are streamed in batches of this many items
+_STREAM_LIST_BATCH = 100
+
+def _iter_json_object(payload):
+    """Encode a dict as JSON one top-level member at a time (same output as jsonify)
+    
+    Top-level lists are encoded a batch of items at a time, so a long list of
+    rows never has to exist as one encoded string.
+    """
+    dumps = app.json.dumps
+    keys = sorted(payload) if app.json.sort_keys else list(payload)
+    yield '{'
+    for index, key in enumerate(keys):
+        value = payload[key]
+        prefix = (',' if index else '') + dumps(key) + ':'
+        if not isinstance(value, list):
+            yield prefix + dumps(value)
+            continue
+        yield prefix + '['
+        for start in range(0, len(value), _STREAM_LIST_BATCH):
+            batch = ','.join(dumps(item) for item in value[start:start + _STREAM_LIST_BATCH])
+            yield (',' if start else '') + batch
+        yield ']'
+    yield '}\n'
+
+def _streamed_json_response(payload):
+    """JSON response that never materializes the whole body, for large payloads"""
+    return Response(_iter_json_object(payload), mimetype=app.json.mimetype)
+
+# Opportunity score points by search volume / competition label
+_SEARCH_VOLUME_POINTS = {"High": 30, "Medium": 20, "Low": 10}
+_COMPETITION_POINTS = {"Low": 30, "Medium": 20, "High": 10}
 
 def _calculate_topic_opportunity_score(topic):
     """Calculate opportunity score for a topic"""
     viral_weight = topic["viral_potential"] * 0.4
-    volume_weight = {"High": 30, "Medium": 20, "Low": 10}.get(topic["search_volume"], 20) * 0.3
-    competition_weight = {"Low": 30, "Medium": 20, "High": 10}.get(topic["competition"], 20) * 0.3
+    volume_weight = _SEARCH_VOLUME_POINTS.get(topic["search_volume"], 20) * 0.3
+    competition_weight = _COMPETITION_POINTS.get(topic["competition"], 20) * 0.3
     return round(viral_weight + volume_weight + competition_weight)
 
 def _get_topic_priority_level(viral_potential):
@@ -74,6 +591,42 @@ def _get_topic_priority_level(viral_potential):
     else:
         return "Low"
 
+def _format_trending_topic(topic):
+    """Trending topic row formatted for the frontend, with derived fields"""
+    return {
+        "id": topic["id"],
+        "title": topic["title"],
+        "viral_potential": topic["viral_potential"],
+        "keywords": topic["keywords"],
+        "search_volume": topic["search_volume"],
+        "competition": topic["competition"],
+        "selected": topic["selected"],
+        "additional_data": topic.get("additional_data", {}),
+        "created_at": topic["created_at"],
+        "updated_at": topic.get("updated_at"),
+        "user_id": topic.get("user_id"),
+        
+        # Enhanced fields
+        "opportunity_score": _calculate_topic_opportunity_score(topic),
+        "is_high_potential": topic["viral_potential"] >= 80,
+        "is_quick_win": topic["viral_potential"] >= 60 and topic["competition"] == "Low",
+        "priority_level": _get_topic_priority_level(topic["viral_potential"])
+    }
+
+# Columns of the trending_topics_enriched view (trending_topics_enriched_view.sql), which
+# computes the derived fields above in Postgres; used until the view turns out to be missing
+_ENRICHED_TOPIC_COLUMNS = (
+    "id,title,viral_potential,keywords,search_volume,competition,selected,additional_data,"
+    "created_at,updated_at,user_id,opportunity_score,is_high_potential,is_quick_win,priority_level"
+)
+_enriched_topics_view_available = True
+
+def _mark_enriched_topics_view_missing():
+    global _enriched_topics_view_available
+    _enriched_topics_view_available = False
+    logger.warning("⚠️ trending_topics_enriched view not found, formatting topics in Python "
+                   "(apply trending_topics_enriched_view.sql to enable it)")
+
 def _get_difficulty_level(score):
     """Get difficulty level from score"""
     if score >= 80:
@@ -96,18 +649,57 @@ def _get_difficulty_color(score):
     else:
         return '#44aa44'  # Beginner - green
 
+@functools.lru_cache(maxsize=64)
+def _format_display(content_format):
+    """Display label for a content format (e.g. 'how_to_guide' -> 'How To Guide')"""
+    return content_format.replace('_', ' ').title()
+
+def _format_content_opportunity(opp):
+    """Content opportunity row formatted for the frontend, with derived fields"""
+    additional_data = opp.get("additional_data", {})
+    difficulty = opp["difficulty"]
+    return {
+        "id": opp["id"],
+        "title": opp["title"],
+        "format": opp["format"],
+        "difficulty": difficulty,
+        "engagement_potential": opp["engagement_potential"],
+        "selected": opp["selected"],
+        "additional_data": additional_data,
+        "created_at": opp["created_at"],
+        "user_id": opp.get("user_id"),
+        
+        # Enhanced fields
+        "format_display": _format_display(opp["format"]),
+        "difficulty_level": _get_difficulty_level(difficulty),
+        "difficulty_color": _get_difficulty_color(difficulty),
+        "time_investment": additional_data.get("time_investment", "2-3 weeks")
+    }
+
 def _is_recent_analysis(created_at):
     """Check if analysis is recent (within 7 days)"""
     if not created_at:
         return False
     
     try:
-        from datetime import datetime, timedelta
         created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
         return datetime.now().replace(tzinfo=created_date.tzinfo) - created_date <= timedelta(days=7)
     except:
         return False
 
+def _enhance_trend_analysis(analysis):
+    """Copy of a trend analysis row with the list view's derived fields added"""
+    meta = analysis.get('metadata') or {}
+    created_at = analysis.get('created_at') or ''
+    return {
+        **analysis,
+        "has_trending_topics": bool(meta.get('trending_topics_count', 0)),
+        "has_opportunities": bool(meta.get('opportunities_count', 0)),
+        "confidence_score": meta.get('confidence_score', 0),
+        "created_date": created_at[:10],  # ISO-8601 timestamps start with YYYY-MM-DD
+        "is_recent": _is_recent_analysis(created_at)
+    }
+
 # ============================================================================
 # MAIN TREND RESEARCH ENDPOINT
 # ============================================================================
@@ -115,7 +707,7 @@ def _is_recent_analysis(created_at):
 @app.route('/api/v2/enhanced-trend-research', methods=['POST'])
 async def enhanced_trend_research():
     try:
-        print("📡 Received request from Noodl")
+        logger.info("📡 Received request from Noodl")
         
         # Get request data
         data = request.get_json()
@@ -125,23 +717,28 @@ async def enhanced_trend_research():
                 "error": "Request body must be JSON"
             }), 400
         
-        print(f"🎯 Topic: {data.get('topic', 'N/A')}")
-        print(f"🤖 LLM Provider: {data.get('llm_config', {}).get('provider', 'N/A')}")
+        logger.info("🎯 Topic: %s", data.get('topic', 'N/A'))
+        logger.info("🤖 LLM Provider: %s", data.get('llm_config', {}).get('provider', 'N/A'))
         
         # EXTRACT AND VALIDATE USER_ID
         user_id, error_response, status_code = extract_and_validate_user_id(data)
         if error_response:
             return jsonify(error_response), status_code
         
-        print(f"👤 User ID: {user_id}")
+        logger.info("👤 User ID: %s", user_id)
         
         # Validate required fields
-        topic = data.get('topic', '').strip()
+        topic = (data.get('topic') or '').strip()
         if not topic:
             return jsonify({
                 "success": False,
                 "error": "Topic is required"
             }), 400
+        if len(topic) > _MAX_TOPIC_LENGTH:
+            return jsonify({
+                "success": False,
+                "error": f"Topic must be at most {_MAX_TOPIC_LENGTH} characters"
+            }), 400
         
         llm_config = data.get('llm_config', {})
         if not llm_config.get('api_key'):
@@ -151,135 +748,112 @@ async def enhanced_trend_research():
             }), 400
         
         # Validate LLM provider
-        supported_providers = ['openai', 'anthropic', 'deepseek', 'gemini', 'kimi']
         provider = llm_config.get('provider', 'openai').lower()
-        if provider not in supported_providers:
+        if provider not in _SUPPORTED_PROVIDERS:
             return jsonify({
                 "success": False,
-                "error": f"Unsupported LLM provider: {provider}. Supported: {supported_providers}"
+                "error": f"Unsupported LLM provider: {provider}. {_SUPPORTED_PROVIDERS_MSG}"
             }), 400
         
-        # Import trend research integration and affiliate research
-        try:
-            from fixed_trend_research import TrendResearchIntegration
-        except ImportError as e:
-            try:
-                # Fallback to original
-                from trend_research_integration import TrendResearchIntegration
-                print("⚠️ Using original trend_research_integration.py (not the fixed version)")
-            except ImportError as e2:
-                return jsonify({
-                    "success": False,
-                    "error": f"Import failed: {e2}. Make sure trend_research_integration.py is in the same directory."
-                }), 500
+        if TrendResearchIntegration is None:
+            return jsonify({
+                "success": False,
+                "error": f"Import failed: {TREND_RESEARCH_IMPORT_ERROR}. Make sure trend_research_integration.py is in the same directory."
+            }), 500
         
-        # Import Linkup-based affiliate research
-        try:
-            from affiliate_research_api_updated import linkup_affiliate_api as affiliate_research
-            affiliate_research_available = True
-            print("✅ Linkup affiliate research module loaded")
-        except ImportError as e:
-            print("⚠️ Affiliate research module not available, proceeding without profitability check")
-            affiliate_research_available = False
+        if not AFFILIATE_RESEARCH_AVAILABLE:
+            logger.warning("⚠️ Affiliate research module not available, proceeding without profitability check")
+        
+        # Optional request fields, read once
+        focus_area = data.get('focus_area', 'general')
+        target_audience = data.get('target_audience', 'professional')
+        collection = data.get('collection', 'default')
+        min_affiliate_score = data.get('min_affiliate_score', 30)
+        linkup_api_key = data.get('linkup_api_key')
+        google_trends_api_key = data.get('google_trends_api_key')
         
         # Setup configuration
         config = {
-            'linkup_api_key': data.get('linkup_api_key'),
-            'google_trends_api_key': data.get('google_trends_api_key')
+            'linkup_api_key': linkup_api_key,
+            'google_trends_api_key': google_trends_api_key
         }
         
         # Create integration instance
         integration = TrendResearchIntegration(config)
         
         # Initialize RLS Supabase storage
-        supabase_storage = ImprovedSupabaseStorage()
-        
-        print("🔍 Starting enhanced trend research analysis...")
+        supabase_storage = _get_storage()
         
-        # PHASE 0: AFFILIATE OFFER RESEARCH (NEW FIRST STEP)
-        print("💰 PHASE 0: Researching affiliate offers for profitability...")
+        logger.info("🔍 Starting enhanced trend research analysis...")
         
-        affiliate_result = None
-        should_proceed = True
-        cancellation_reason = None
+        # PHASE 0: AFFILIATE OFFER RESEARCH
+        # Runs concurrently with the trend analysis below; the gating never cancels the
+        # analysis (low scores only add warnings), so nothing has to wait for it
+        affiliate_storage_task = None
         
-        if affiliate_research_available:
+        async def run_affiliate_phase():
+            nonlocal affiliate_storage_task
+            if not AFFILIATE_RESEARCH_AVAILABLE:
+                logger.warning("⚠️ Affiliate research unavailable, proceeding directly to trend analysis")
+                return None
+            
+            logger.info("💰 PHASE 0: Researching affiliate offers for profitability...")
+            affiliate_result = None
             try:
-                async def run_affiliate_research():
-                    return await affiliate_research.research_affiliate_offers(
+                # The Linkup search inside is cached per topic; the per-user storage and
+                # reuse step always runs
+                affiliate_result = await asyncio.wait_for(
+                    affiliate_research.research_affiliate_offers(
                         topic=topic,
                         user_id=user_id,
-                        min_commission_threshold=data.get('min_affiliate_score', 30)
-                    )
-                
-                affiliate_result = await asyncio.wait_for(
-                    run_affiliate_research(),
+                        min_commission_threshold=min_affiliate_score
+                    ),
                     timeout=30  # 30 second timeout for affiliate research
                 )
                 
                 # Check if affiliate research was successful
                 if not affiliate_result.get('success', False):
-                    print(f"⚠️ Affiliate research failed: {affiliate_result.get('error', 'Unknown error')}, proceeding with trend analysis")
+                    logger.warning("⚠️ Affiliate research failed: %s, proceeding with trend analysis", affiliate_result.get('error', 'Unknown error'))
                     affiliate_result = None
-                    should_proceed = True  # Allow to proceed even if affiliate research fails
                 else:
-                    # Store affiliate research results in Supabase
-                    print("💾 Storing affiliate research results...")
-                    try:
-                        # Import the storage module
-                        from supabase_affiliate_storage import affiliate_storage
-                        
-                        # Store the complete affiliate research
-                        storage_result = await affiliate_storage.store_affiliate_research(
+                    # Store affiliate research results in Supabase in the background; the
+                    # storage ID is collected just before the response is built
+                    logger.info("💾 Storing affiliate research results...")
+                    if affiliate_storage is None:
+                        logger.warning("⚠️ Failed to store affiliate research: affiliate storage unavailable: %s", AFFILIATE_STORAGE_IMPORT_ERROR)
+                    else:
+                        affiliate_storage_task = asyncio.create_task(affiliate_storage.store_affiliate_research(
                             topic=topic,
                             user_id=user_id,
                             research_data=affiliate_result['affiliate_research']
-                        )
-                        print(f"✅ Affiliate research stored successfully: {storage_result}")
-                        
-                        # Update affiliate_result with storage info
-                        affiliate_result['storage_id'] = storage_result
-                        
-                    except Exception as e:
-                        print(f"⚠️ Failed to store affiliate research: {e}")
-                        # Don't fail the whole process if storage fails
+                        ))
                     
                     # Access profitability analysis safely
                     profitability = affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {})
                     score = profitability.get('score', 0)
                     level = profitability.get('level', 'unknown')
                     
-                    should_proceed = int(score) >= int(data.get('min_affiliate_score', 30))
+                    should_proceed = int(score) >= int(min_affiliate_score)
                     
                     if not should_proceed:
-                        warning_message = f"⚠️ Topic profitability score {score} below threshold {data.get('min_affiliate_score', 30)}"
-                        print(f"🔄 {warning_message} - Continuing with caution")
+                        warning_message = f"⚠️ Topic profitability score {score} below threshold {min_affiliate_score}"
+                        logger.info("🔄 %s - Continuing with caution", warning_message)
                         
                         # Continue with analysis but provide warnings and suggestions
-                        affiliate_result['profitability_analysis']['warning'] = warning_message
-                        affiliate_result['profitability_analysis']['suggestions'] = [
-                            "Try more specific subtopics (e.g., 'smart home security cameras' instead of 'home security')",
-                            "Explore related high-commission niches (e.g., 'home automation systems', 'security software')",
-                            "Consider seasonal trends - holiday security sales spike in Q4",
-                            "Focus on high-ticket items like complete security systems vs individual sensors",
-                            "Research B2B opportunities - commercial security systems have higher commissions",
-                            "Look for subscription-based security services with recurring commissions",
-                            "Expand to related categories: insurance, home improvement, smart home hubs",
-                            "Check for high-commission software/tools used in security industry"
-                        ]
+                        profitability['warning'] = warning_message
+                        profitability['suggestions'] = list(_PROFITABILITY_SUGGESTIONS)
                         
                         # Always proceed but flag as low profitability
                         should_proceed = True
-                        affiliate_result['profitability_analysis']['force_continue'] = True
+                        profitability['force_continue'] = True
                     else:
-                        print(f"✅ Topic approved - profitability score: {score}")
+                        logger.info("✅ Topic approved - profitability score: %s", score)
                         
             except asyncio.TimeoutError:
-                print("⚠️ Affiliate research timed out, proceeding with trend analysis")
+                logger.warning("⚠️ Affiliate research timed out, proceeding with trend analysis")
             except Exception as e:
-                print(f"⚠️ Affiliate research failed: {e}, proceeding with trend analysis")
-        else:
-            print("⚠️ Affiliate research unavailable, proceeding directly to trend analysis")
+                logger.warning("⚠️ Affiliate research failed: %s, proceeding with trend analysis", e)
+            return affiliate_result
         
         # Run the analysis with timeout handling
  
@@ -291,90 +865,92 @@ async def enhanced_trend_research():
                 result = await asyncio.wait_for(
                     integration.enhanced_trend_research_for_blog_analyzer(
                         topic=topic,
-                        collection_name=data.get('collection', 'default'),
+                        collection_name=collection,
                         llm_config=llm_config,
-                        focus_area=data.get('focus_area', 'general'),
-                        target_audience=data.get('target_audience', 'professional'),
-                        linkup_api_key=data.get('linkup_api_key'),
-                        google_trends_api_key=data.get('google_trends_api_key')
+                        focus_area=focus_area,
+                        target_audience=target_audience,
+                        linkup_api_key=linkup_api_key,
+                        google_trends_api_key=google_trends_api_key
                     ),
                     timeout=150  # 2.5 minute total timeout
                 )
                 
+                # One timestamp for the PyTrends metadata, the result and the response
+                now_iso = datetime.now().isoformat()
+                
+                # CRITICAL FIX: Save PyTrends data to analysis metadata, as part of the insert
+                pytrends_metadata = None
+                if result.get('pytrends_analysis'):
+                    logger.info("🔧 Saving PyTrends data to analysis metadata...")
+                    pytrends_metadata = {
+                        "pytrends_analysis": result['pytrends_analysis'],
+                        "pytrends_enhanced": result.get('pytrends_enhanced', False),
+                        "pytrends_timestamp": now_iso,
+                        "confidence_score": result.get('confidence_score', 85)
+                    }
+                
                 # Enhanced: Save results to Supabase WITH USER_ID
-                print(f"💾 Saving enhanced results to Supabase for user: {user_id}")
+                logger.info("💾 Saving enhanced results to Supabase for user: %s", user_id)
                 trend_analysis_id = await supabase_storage.save_trend_analysis_results(
                     trend_result=result,
                     user_id=user_id,
                     topic=topic,
-                    target_audience=data.get('target_audience', 'professional'),
-                    focus_area=data.get('focus_area', 'general')
+                    target_audience=target_audience,
+                    focus_area=focus_area,
+                    metadata=pytrends_metadata
                 )
-                
-                # CRITICAL FIX: Save PyTrends data to analysis metadata
-                if result.get('pytrends_analysis'):
-                    print("🔧 Saving PyTrends data to analysis metadata...")
-                    try:
-                        # Update the analysis record with PyTrends data
-                        pytrends_metadata = {
-                            "pytrends_analysis": result['pytrends_analysis'],
-                            "pytrends_enhanced": result.get('pytrends_enhanced', False),
-                            "pytrends_timestamp": datetime.now().isoformat(),
-                            "confidence_score": result.get('confidence_score', 85)
-                        }
-                        
-                        # Update the trend analysis with PyTrends metadata
-                        update_result = supabase_storage._execute_query(
-                            'PATCH',
-                            f'trend_analyses?id=eq.{trend_analysis_id}&user_id=eq.{user_id}',
-                            {"metadata": pytrends_metadata, "updated_at": datetime.now().isoformat()}
-                        )
-                        
-                        if update_result['success']:
-                            print("✅ PyTrends data saved to Supabase metadata")
-                        else:
-                            print(f"⚠️ Failed to save PyTrends metadata: {update_result.get('error')}")
-                            
-                    except Exception as e:
-                        print(f"⚠️ Error saving PyTrends metadata: {e}")
+                _invalidate_trend_analyses(user_id)
                 
                 # Add enhanced Supabase metadata to result
                 result['trend_analysis_id'] = trend_analysis_id
                 result['supabase_saved'] = True
-                result['storage_timestamp'] = datetime.now().isoformat()
+                result['storage_timestamp'] = now_iso
                 result['enhanced_storage'] = True
                 result['user_id'] = user_id
                 result['pytrends_data_saved'] = bool(result.get('pytrends_analysis'))
                 
-                print(f"✅ Enhanced results saved to Supabase with ID: {trend_analysis_id}")
-                print(f"📊 PyTrends data included: {bool(result.get('pytrends_analysis'))}")
+                logger.info("✅ Enhanced results saved to Supabase with ID: %s", trend_analysis_id)
+                logger.info("📊 PyTrends data included: %s", bool(result.get('pytrends_analysis')))
                 
                 return result
                 
             except asyncio.TimeoutError:
-                print("❌ Analysis timed out after 2.5 minutes")
-                raise Exception("Analysis timed out. Please try with a more specific topic or check your API keys.")
+                logger.error("❌ Analysis timed out after 2.5 minutes")
+                raise AnalysisTimeoutError("Analysis timed out. Please try with a more specific topic or check your API keys.")
             except Exception as e:
-                print(f"❌ Analysis failed: {e}")
+                logger.error("❌ Analysis failed: %s", e)
                 raise
         
-        # Execute async analysis using existing event loop
+        # Start affiliate research in the background so it overlaps the trend analysis
+        affiliate_task = asyncio.create_task(run_affiliate_phase())
+        
+        # The view already runs on an event loop, so await the analysis directly
         try:
-            # Check if we're already in an event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # We're in a running loop, use async_to_sync pattern
-                import nest_asyncio
-                nest_asyncio.apply()
-                result = loop.run_until_complete(run_analysis())
-            else:
-                # No loop running, use normal approach
-                result = loop.run_until_complete(run_analysis())
-        except RuntimeError:
-            # No event loop in current context
-            result = asyncio.run(run_analysis())
+            result = await run_analysis()
+        except Exception:
+            affiliate_task.cancel()
+            if affiliate_storage_task is not None:
+                affiliate_storage_task.cancel()
+            raise
+        
+        affiliate_result = await affiliate_task
+        
+        if affiliate_storage_task is not None:
+            # Don't fail the whole process if storage fails
+            try:
+                storage_result = await affiliate_storage_task
+                logger.info("✅ Affiliate research stored successfully: %s", storage_result)
+                
+                # Update affiliate_result with storage info
+                if affiliate_result is not None:
+                    affiliate_result['storage_id'] = storage_result
+            except Exception as e:
+                logger.warning("⚠️ Failed to store affiliate research: %s", e)
+        
+        logger.info("✅ Enhanced analysis completed successfully")
         
-        print("✅ Enhanced analysis completed successfully")
+        # Profitability fields for the response (None when affiliate research didn't run)
+        prof = affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}) if affiliate_result else None
         
         # Enhanced response with PyTrends quality metrics and affiliate research
         response_data = {
@@ -383,9 +959,9 @@ async def enhanced_trend_research():
             "affiliate_research_data": affiliate_result,
             "metadata": {
                 "topic": topic,
-                "focus_area": data.get('focus_area', 'general'),
-                "target_audience": data.get('target_audience', 'professional'),
-                "collection": data.get('collection', 'default'),
+                "focus_area": focus_area,
+                "target_audience": target_audience,
+                "collection": collection,
                 "trend_analysis_id": result.get('trend_analysis_id'),
                 "user_id": user_id,
                 "supabase_saved": True,
@@ -396,14 +972,14 @@ async def enhanced_trend_research():
                 "pytrends_enhanced": result.get('pytrends_enhanced', False),
                 "pytrends_data_available": bool(result.get('pytrends_analysis')),
                 "affiliate_research_completed": affiliate_result is not None,
-                "profitability_score": affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('score', 0) if affiliate_result else None,
-                "profitability_level": affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('level', 'unknown') if affiliate_result else None,
-                "profitability_warning": affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('warning') if affiliate_result else None,
-                "profitability_suggestions": affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('suggestions') if affiliate_result else None,
-                "force_continue": affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('force_continue', False) if affiliate_result else False,
+                "profitability_score": prof.get('score', 0) if prof is not None else None,
+                "profitability_level": prof.get('level', 'unknown') if prof is not None else None,
+                "profitability_warning": prof.get('warning') if prof is not None else None,
+                "profitability_suggestions": prof.get('suggestions') if prof is not None else None,
+                "force_continue": prof.get('force_continue', False) if prof is not None else False,
                 "fallback_mode": result.get('fallback_mode', False),
                 "processing_time": result.get('processing_time', 0),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": result['storage_timestamp'],
                 "llm_provider": provider,
                 "api_version": "v2_enhanced_rls_pytrends_affiliate"
             },
@@ -416,102 +992,90 @@ async def enhanced_trend_research():
                 "geographic_insights": len(result.get('pytrends_analysis', {}).get('geographic_insights', {}).get('global_hotspots', [])),
                 "actionable_insights": len(result.get('pytrends_analysis', {}).get('actionable_insights', [])),
                 "ready_for_phase2": bool(result.get('trend_analysis_id')),
-                "profitable_topic": affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('level', 'unknown') in ['good', 'excellent'] if affiliate_result else None,
-                "low_profitability_warning": bool(affiliate_result and affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('warning')),
-                "profitability_score": affiliate_result.get('affiliate_research', {}).get('profitability_analysis', {}).get('score', 0) if affiliate_result else None
+                "profitable_topic": prof.get('level', 'unknown') in ('good', 'excellent') if prof is not None else None,
+                "low_profitability_warning": bool(prof is not None and prof.get('warning')),
+                "profitability_score": prof.get('score', 0) if prof is not None else None
             }
         }
         
         return jsonify(response_data)
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
-        
-        
-        error_response = {
-            "success": False,
-            "error": f"Analysis failed: {str(e)}",
-            "error_type": type(e).__name__,
-            "troubleshooting": {
-                "common_causes": [
-                    "Invalid or missing API key",
-                    "Invalid or missing user_id",
-                    "Network connectivity issues",
-                    "LLM service unavailable",
-                    "Topic too broad or complex"
-                ],
-                "suggested_actions": [
-                    "Verify your API key is correct and active",
-                    "Ensure user_id is a valid UUID from Noodl authentication",
-                    "Try a more specific topic",
-                    "Check your internet connection",
-                    "Wait a moment and try again"
-                ]
-            }
-        }
-        
-        # Determine appropriate HTTP status code
-        if "timeout" in str(e).lower():
-            return jsonify(error_response), 408  # Request Timeout
-        elif "api key" in str(e).lower():
-            return jsonify(error_response), 401  # Unauthorized
-        elif "user_id" in str(e).lower() or "uuid" in str(e).lower():
-            return jsonify(error_response), 400  # Bad Request
-        elif "not found" in str(e).lower():
-            return jsonify(error_response), 404  # Not Found
-        else:
-            return jsonify(error_response), 500  # Internal Server Error
+        logger.exception("❌ Error: %s", e)
+        return _analysis_error_response(e)
 
 # ============================================================================
 # RLS-ENABLED ENDPOINTS FOR PHASE 2 INTEGRATION
 # ============================================================================
 
+# Read endpoints that take user_id as a query parameter, with each one's invalid-ID message
+_QUERY_USER_ID_ENDPOINTS = {
+    'get_trend_analyses': "Invalid user_id format. Must be a valid UUID.",
+    'get_trend_analysis_details': "Invalid user_id or analysis_id format. Must be valid UUIDs.",
+    'get_trending_topics': "Invalid user_id or analysis_id format",
+    'get_content_opportunities': "Invalid user_id or analysis_id format",
+    'get_blog_ideas_endpoint': "Invalid user_id or analysis_id format. Must be valid UUIDs.",
+    'get_blog_idea_details_endpoint': "Invalid user_id or idea_id format",
+    'get_content_calendar_endpoint': "Invalid user_id or analysis_id format",
+    'get_strategic_insights_endpoint': "Invalid user_id or analysis_id format",
+}
+
+def _json_error_body(message):
+    return app.json.dumps({"success": False, "error": message}) + "\n"
+
+# Error bodies are encoded once at import and reused for every rejected request
+_ERR_USER_ID_REQUIRED = _json_error_body("user_id is required as query parameter")
+_ERR_INVALID_IDS = {endpoint: _json_error_body(message) for endpoint, message in _QUERY_USER_ID_ENDPOINTS.items()}
+
+@app.before_request
+def _validate_query_user_id():
+    """Validate user_id and the ID path segments for the user-scoped read endpoints
+    
+    Every path argument of these endpoints is an ID (analysis_id, idea_id). The validated
+    user_id is stored on ``g.user_id`` for the view.
+    """
+    # CORS preflights carry no query string; let Flask answer them as before
+    if request.method == 'OPTIONS' or request.endpoint not in _QUERY_USER_ID_ENDPOINTS:
+        return None
+    
+    user_id = request.args.get('user_id')
+    if not user_id:
+        return Response(_ERR_USER_ID_REQUIRED, status=400, mimetype=app.json.mimetype)
+    
+    if not _is_valid_uuid(user_id) or not all(map(_is_valid_uuid, (request.view_args or {}).values())):
+        return Response(_ERR_INVALID_IDS[request.endpoint], status=400, mimetype=app.json.mimetype)
+    
+    g.user_id = user_id
+    return None
+
 @app.route('/api/v2/trend-analyses', methods=['GET'])
 def get_trend_analyses():
     """Get list of saved trend analyses for authenticated user"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
-        
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
-        
-        # Validate user_id
-        try:
-            uuid.UUID(user_id)
-        except ValueError:
-            return jsonify({
-                "success": False,
-                "error": "Invalid user_id format. Must be a valid UUID."
-            }), 400
+        # user_id was validated by _validate_query_user_id
+        user_id = g.user_id
         
-        supabase_storage = ImprovedSupabaseStorage()
+        supabase_storage = _get_storage()
         
         # Get query parameters
         limit = int(request.args.get('limit', 20))
         
-        # Get user's trend analyses only (RLS filtered)
-        analyses = supabase_storage.get_all_trend_analyses(limit=limit, user_id=user_id)
-        
-        # Add enhanced metadata to each analysis
-        enhanced_analyses = []
-        for analysis in analyses:
-            enhanced_analysis = analysis.copy()
-            enhanced_analysis.update({
-                "has_trending_topics": bool(analysis.get('metadata', {}).get('trending_topics_count', 0)),
-                "has_opportunities": bool(analysis.get('metadata', {}).get('opportunities_count', 0)),
-                "confidence_score": analysis.get('metadata', {}).get('confidence_score', 0),
-                "created_date": analysis.get('created_at', '').split('T')[0] if analysis.get('created_at') else '',
-                "is_recent": _is_recent_analysis(analysis.get('created_at', ''))
-            })
-            enhanced_analyses.append(enhanced_analysis)
+        enhanced_analyses = _get_cached_trend_analyses(user_id, limit)
+        if enhanced_analyses is None:
+            # Get user's trend analyses only (RLS filtered)
+            analyses = supabase_storage.get_all_trend_analyses(limit=limit, user_id=user_id)
+            
+            # Add enhanced metadata to each analysis
+            enhanced_analyses = [_enhance_trend_analysis(analysis) for analysis in analyses]
+            _cache_trend_analyses(user_id, limit, enhanced_analyses)
         
-        return jsonify({
+        # is_recent depends on the day, so the date is part of the ETag
+        etag = _rows_etag(enhanced_analyses, request.query_string, datetime.now().date())
+        not_modified = _not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+        
+        return _with_etag(jsonify({
             "success": True,
             "trend_analyses": enhanced_analyses,
             "count": len(enhanced_analyses),
@@ -519,12 +1083,12 @@ def get_trend_analyses():
             "metadata": {
                 "limit": limit,
                 "user_filtered": True,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
-        })
+        }), etag)
         
     except Exception as e:
-        print(f"❌ Error getting trend analyses: {e}")
+        logger.exception("❌ Error getting trend analyses")
         return jsonify({
             "success": False,
             "error": f"Failed to get trend analyses: {str(e)}"
@@ -535,48 +1099,45 @@ def get_trend_analyses():
 def get_trend_analysis_details(analysis_id):
     """Get detailed trend analysis data for authenticated user"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
+        # user_id was validated by _validate_query_user_id
+        user_id = g.user_id
         
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
+        supabase_storage = _get_storage()
         
-        # Validate UUIDs
-        try:
-            uuid.UUID(user_id)
-            uuid.UUID(analysis_id)
-        except ValueError:
+        # ?include=summary returns only the metadata, computed from counts instead of full rows
+        if request.args.get('include') == 'summary':
+            summary = supabase_storage.get_trend_analysis_summary(analysis_id, user_id)
             return jsonify({
-                "success": False,
-                "error": "Invalid user_id or analysis_id format. Must be valid UUIDs."
-            }), 400
-        
-        supabase_storage = ImprovedSupabaseStorage()
+                "success": True,
+                "trend_analysis_summary": summary,
+                "enhanced_metadata": {
+                    "has_pytrends_data": summary['has_pytrends_data'],
+                    "data_completeness": {
+                        "trending_topics": summary['trending_topics_count'],
+                        "content_opportunities": summary['content_opportunities_count'],
+                        "keyword_intelligence": summary['keyword_intelligence_count'] > 0,
+                        "market_insights": False,  # not stored for trend analyses
+                        "pytrends_insights": summary['actionable_insights_count']
+                    },
+                    "quality_score": summary['confidence_score'],
+                    "user_id": user_id,
+                    "access_verified": True
+                }
+            })
         
         # Get complete trend analysis data (RLS will ensure user can only access their own)
-        async def get_data():
-            return await supabase_storage.get_trend_analysis_for_phase2(analysis_id, user_id)
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            data = loop.run_until_complete(get_data())
-        finally:
-            loop.close()
+        data = _run_async(supabase_storage.get_trend_analysis_for_phase2(analysis_id, user_id))
+        pytrends_data = data.get('pytrends_analysis') or {}
         
         # Add enhanced metadata
         enhanced_metadata = {
-            "has_pytrends_data": bool(data.get('pytrends_data')),
+            "has_pytrends_data": bool(pytrends_data),
             "data_completeness": {
                 "trending_topics": len(data.get('trending_topics', [])),
                 "content_opportunities": len(data.get('content_opportunities', [])),
                 "keyword_intelligence": bool(data.get('keyword_intelligence')),
                 "market_insights": bool(data.get('market_insights')),
-                "pytrends_insights": len(data.get('pytrends_data', {}))
+                "pytrends_insights": len(pytrends_data.get('actionable_insights') or [])
             },
             "quality_score": data.get('analysis_info', {}).get('metadata', {}).get('confidence_score', 0),
             "user_id": user_id,
@@ -590,7 +1151,7 @@ def get_trend_analysis_details(analysis_id):
         })
         
     except Exception as e:
-        print(f"❌ Error getting trend analysis details: {e}")
+        logger.exception("❌ Error getting trend analysis details")
         
         # Check if it's an access denied error
         if "not found or access denied" in str(e):
@@ -608,26 +1169,10 @@ def get_trend_analysis_details(analysis_id):
 def get_trending_topics(analysis_id):
     """Get trending topics with enhanced filtering and sorting for authenticated user"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
+        # user_id was validated by _validate_query_user_id
+        user_id = g.user_id
         
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
-        
-        # Validate UUIDs
-        try:
-            uuid.UUID(user_id)
-            uuid.UUID(analysis_id)
-        except ValueError:
-            return jsonify({
-                "success": False,
-                "error": "Invalid user_id or analysis_id format"
-            }), 400
-        
-        supabase_storage = ImprovedSupabaseStorage()
+        supabase_storage = _get_storage()
         
         # Get query parameters
         selected_only = request.args.get('selected_only', 'false').lower() == 'true'
@@ -635,47 +1180,44 @@ def get_trending_topics(analysis_id):
         sort_order = request.args.get('sort_order', 'desc')
         
         # Build query with user filtering (RLS)
-        filter_params = f"trend_analysis_id=eq.{analysis_id}&user_id=eq.{user_id}"
+        filter_params = [('trend_analysis_id', f'eq.{analysis_id}'), ('user_id', f'eq.{user_id}')]
         
         if selected_only:
-            filter_params += "&selected=eq.true"
+            filter_params.append(('selected', 'eq.true'))
         
         # Apply sorting
         ascending = sort_order.lower() == 'asc'
-        order_param = f"&order={sort_by}.{'asc' if ascending else 'desc'}"
-        
-        endpoint = f"trending_topics?{filter_params}&select=*{order_param}"
-        response = supabase_storage._execute_query('GET', endpoint)
-        
-        if not response['success']:
-            raise Exception(f"Failed to get trending topics: {response.get('error')}")
+        order_param = ('order', f"{sort_by}.{'asc' if ascending else 'desc'}")
+        
+        # Prefer the enriched view, which returns rows already formatted by Postgres
+        formatted_topics = None
+        if _enriched_topics_view_available:
+            endpoint = "trending_topics_enriched?" + _postgrest_query(filter_params, ('select', _ENRICHED_TOPIC_COLUMNS), order_param)
+            response = supabase_storage._execute_query('GET', endpoint)
+            if response['success']:
+                formatted_topics = response['data']
+            elif response.get('status_code') == 404:
+                _mark_enriched_topics_view_missing()
+            else:
+                raise Exception(f"Failed to get trending topics: {response.get('error')}")
         
-        # Format topics for frontend consumption with enhanced data
-        formatted_topics = []
-        for topic in response['data']:
-            additional_data = topic.get("additional_data", {})
+        if formatted_topics is None:
+            endpoint = "trending_topics?" + _postgrest_query(filter_params, ('select', '*'), order_param)
+            response = supabase_storage._execute_query('GET', endpoint)
             
-            formatted_topic = {
-                "id": topic["id"],
-                "title": topic["title"],
-                "viral_potential": topic["viral_potential"],
-                "keywords": topic["keywords"],
-                "search_volume": topic["search_volume"],
-                "competition": topic["competition"],
-                "selected": topic["selected"],
-                "additional_data": additional_data,
-                "created_at": topic["created_at"],
-                "user_id": topic.get("user_id"),
-                
-                # Enhanced fields
-                "opportunity_score": _calculate_topic_opportunity_score(topic),
-                "is_high_potential": topic["viral_potential"] >= 80,
-                "is_quick_win": topic["viral_potential"] >= 60 and topic["competition"] == "Low",
-                "priority_level": _get_topic_priority_level(topic["viral_potential"])
-            }
-            formatted_topics.append(formatted_topic)
+            if not response['success']:
+                raise Exception(f"Failed to get trending topics: {response.get('error')}")
+            
+            # Format topics for frontend consumption with enhanced data
+            formatted_topics = [_format_trending_topic(topic) for topic in response['data']]
         
-        return jsonify({
+        etag = _rows_etag(formatted_topics, request.path, request.query_string)
+        not_modified = _not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+        
+        # Topic lists can be long; stream them instead of encoding the whole body at once
+        return _with_etag(_streamed_json_response({
             "success": True,
             "trending_topics": formatted_topics,
             "count": len(formatted_topics),
@@ -686,10 +1228,10 @@ def get_trending_topics(analysis_id):
                 "sort_by": sort_by,
                 "sort_order": sort_order
             }
-        })
+        }), etag)
         
     except Exception as e:
-        print(f"❌ Error getting trending topics: {e}")
+        logger.exception("❌ Error getting trending topics")
         return jsonify({
             "success": False,
             "error": f"Failed to get trending topics: {str(e)}"
@@ -699,26 +1241,10 @@ def get_trending_topics(analysis_id):
 def get_content_opportunities(analysis_id):
     """Get content opportunities with enhanced filtering for authenticated user"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
-        
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
-        
-        # Validate UUIDs
-        try:
-            uuid.UUID(user_id)
-            uuid.UUID(analysis_id)
-        except ValueError:
-            return jsonify({
-                "success": False,
-                "error": "Invalid user_id or analysis_id format"
-            }), 400
+        # user_id was validated by _validate_query_user_id
+        user_id = g.user_id
         
-        supabase_storage = ImprovedSupabaseStorage()
+        supabase_storage = _get_storage()
         
         # Get query parameters
         selected_only = request.args.get('selected_only', 'false').lower() == 'true'
@@ -726,48 +1252,32 @@ def get_content_opportunities(analysis_id):
         engagement_filter = request.args.get('engagement')
         
         # Build query with user filtering (RLS)
-        filter_params = f"trend_analysis_id=eq.{analysis_id}&user_id=eq.{user_id}"
+        filter_params = [('trend_analysis_id', f'eq.{analysis_id}'), ('user_id', f'eq.{user_id}')]
         
         if selected_only:
-            filter_params += "&selected=eq.true"
+            filter_params.append(('selected', 'eq.true'))
         
         if format_filter:
-            filter_params += f"&format=eq.{format_filter}"
+            filter_params.append(('format', f'eq.{format_filter}'))
             
         if engagement_filter:
-            filter_params += f"&engagement_potential=eq.{engagement_filter}"
+            filter_params.append(('engagement_potential', f'eq.{engagement_filter}'))
         
-        endpoint = f"content_opportunities?{filter_params}&select=*&order=difficulty.asc"
+        endpoint = "content_opportunities?" + _postgrest_query(filter_params, ('select', '*'), ('order', 'difficulty.asc'))
         response = supabase_storage._execute_query('GET', endpoint)
         
         if not response['success']:
             raise Exception(f"Failed to get content opportunities: {response.get('error')}")
         
+        etag = _rows_etag(response['data'], request.path, request.query_string)
+        not_modified = _not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+        
         # Format opportunities for frontend with enhanced data
-        formatted_opportunities = []
-        for opp in response['data']:
-            additional_data = opp.get("additional_data", {})
-            
-            formatted_opp = {
-                "id": opp["id"],
-                "title": opp["title"],
-                "format": opp["format"],
-                "difficulty": opp["difficulty"],
-                "engagement_potential": opp["engagement_potential"],
-                "selected": opp["selected"],
-                "additional_data": additional_data,
-                "created_at": opp["created_at"],
-                "user_id": opp.get("user_id"),
-                
-                # Enhanced fields
-                "format_display": opp["format"].replace('_', ' ').title(),
-                "difficulty_level": _get_difficulty_level(opp["difficulty"]),
-                "difficulty_color": _get_difficulty_color(opp["difficulty"]),
-                "time_investment": additional_data.get("time_investment", "2-3 weeks")
-            }
-            formatted_opportunities.append(formatted_opp)
+        formatted_opportunities = [_format_content_opportunity(opp) for opp in response['data']]
         
-        return jsonify({
+        return _with_etag(_streamed_json_response({
             "success": True,
             "content_opportunities": formatted_opportunities,
             "count": len(formatted_opportunities),
@@ -778,15 +1288,19 @@ def get_content_opportunities(analysis_id):
                 "format_filter": format_filter,
                 "engagement_filter": engagement_filter
             }
-        })
+        }), etag)
         
     except Exception as e:
-        print(f"❌ Error getting content opportunities: {e}")
+        logger.exception("❌ Error getting content opportunities")
         return jsonify({
             "success": False,
             "error": f"Failed to get content opportunities: {str(e)}"
         }), 500
 
+# PostgREST endpoints for the selection toggles; both ids are validated UUIDs
+_TOPIC_PATCH_URL = "trending_topics?id=eq.{id}&user_id=eq.{uid}"
+_OPP_PATCH_URL = "content_opportunities?id=eq.{id}&user_id=eq.{uid}"
+
 @app.route('/api/v2/topics/<topic_id>/select', methods=['PATCH'])
 def toggle_topic_selection(topic_id):
     """Toggle trending topic selection for authenticated user"""
@@ -801,15 +1315,13 @@ def toggle_topic_selection(topic_id):
         selected = data.get('selected', True) if data else True
         
         # Validate topic_id
-        try:
-            uuid.UUID(topic_id)
-        except ValueError:
+        if not _is_valid_uuid(topic_id):
             return jsonify({
                 "success": False,
                 "error": "Invalid topic_id format"
             }), 400
         
-        supabase_storage = ImprovedSupabaseStorage()
+        supabase_storage = _get_storage()
         
         # Update selection with user filtering (RLS ensures user can only update their own topics)
         update_data = {
@@ -817,7 +1329,7 @@ def toggle_topic_selection(topic_id):
             "updated_at": datetime.now().isoformat()
         }
         
-        endpoint = f"trending_topics?id=eq.{topic_id}&user_id=eq.{user_id}"
+        endpoint = _TOPIC_PATCH_URL.format(id=topic_id, uid=user_id)
         response = supabase_storage._execute_query('PATCH', endpoint, update_data)
         
         if not response['success']:
@@ -834,11 +1346,11 @@ def toggle_topic_selection(topic_id):
             "topic_id": topic_id,
             "user_id": user_id,
             "selected": selected,
-            "updated_at": datetime.now().isoformat()
+            "updated_at": update_data["updated_at"]
         })
         
     except Exception as e:
-        print(f"❌ Error updating topic selection: {e}")
+        logger.exception("❌ Error updating topic selection")
         return jsonify({
             "success": False,
             "error": f"Failed to update topic selection: {str(e)}"
@@ -858,15 +1370,13 @@ def toggle_opportunity_selection(opportunity_id):
         selected = data.get('selected', True) if data else True
         
         # Validate opportunity_id
-        try:
-            uuid.UUID(opportunity_id)
-        except ValueError:
+        if not _is_valid_uuid(opportunity_id):
             return jsonify({
                 "success": False,
                 "error": "Invalid opportunity_id format"
             }), 400
         
-        supabase_storage = ImprovedSupabaseStorage()
+        supabase_storage = _get_storage()
         
         # Update selection with user filtering (RLS)
         update_data = {
@@ -874,7 +1384,7 @@ def toggle_opportunity_selection(opportunity_id):
             "updated_at": datetime.now().isoformat()
         }
         
-        endpoint = f"content_opportunities?id=eq.{opportunity_id}&user_id=eq.{user_id}"
+        endpoint = _OPP_PATCH_URL.format(id=opportunity_id, uid=user_id)
         response = supabase_storage._execute_query('PATCH', endpoint, update_data)
         
         if not response['success']:
@@ -891,32 +1401,138 @@ def toggle_opportunity_selection(opportunity_id):
             "opportunity_id": opportunity_id,
             "user_id": user_id,
             "selected": selected,
-            "updated_at": datetime.now().isoformat()
+            "updated_at": update_data["updated_at"]
         })
         
     except Exception as e:
-        print(f"❌ Error updating opportunity selection: {e}")
+        logger.exception("❌ Error updating opportunity selection")
         return jsonify({
             "success": False,
             "error": f"Failed to update opportunity selection: {str(e)}"
         }), 500
 
+# Most rows one batch selection request may update
+_MAX_SELECTION_BATCH = 500
+
+def _batch_update_selection(table, id_field, plural):
+    """Shared body of the batch selection endpoints for trending_topics / content_opportunities
+    
+    Rows are grouped by their new ``selected`` value and each group is updated with a
+    single ``id=in.(...)`` PATCH, so a batch costs at most two Supabase round trips.
+    """
+    try:
+        data = request.get_json()
+        
+        # Extract and validate user_id
+        user_id, error_response, status_code = extract_and_validate_user_id(data)
+        if error_response:
+            return jsonify(error_response), status_code
+        
+        selections = data.get('selections')
+        if not isinstance(selections, list) or not selections:
+            return jsonify({
+                "success": False,
+                "error": "selections must be a non-empty list of {id, selected} objects"
+            }), 400
+        if len(selections) > _MAX_SELECTION_BATCH:
+            return jsonify({
+                "success": False,
+                "error": f"At most {_MAX_SELECTION_BATCH} selections per request"
+            }), 400
+        
+        # IDs are normalized to the canonical lowercase form PostgREST returns
+        ids_by_value = {True: [], False: []}
+        requested_ids = []
+        for item in selections:
+            item_id = item.get('id') if isinstance(item, dict) else None
+            if not _is_valid_uuid(item_id):
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid {id_field} format: {item_id}"
+                }), 400
+            selected = item.get('selected', True)
+            if not isinstance(selected, bool):
+                return jsonify({
+                    "success": False,
+                    "error": f"selected must be true or false for {id_field} {item_id}"
+                }), 400
+            item_id = str(uuid.UUID(item_id))
+            requested_ids.append(item_id)
+            ids_by_value[selected].append(item_id)
+        
+        supabase_storage = _get_storage()
+        updated_at = datetime.now().isoformat()
+        updated_ids = []
+        
+        for selected, ids in ids_by_value.items():
+            if not ids:
+                continue
+            endpoint = f"{table}?" + _postgrest_query(
+                [('id', f"in.({','.join(ids)})"), ('user_id', f'eq.{user_id}')], ('select', 'id')
+            )
+            response = supabase_storage._execute_query('PATCH', endpoint, {"selected": selected, "updated_at": updated_at})
+            if not response['success']:
+                raise Exception(f"Failed to update {plural} selection: {response.get('error')}")
+            updated_ids.extend(row['id'] for row in response['data'])
+        
+        updated = set(updated_ids)
+        return jsonify({
+            "success": True,
+            "user_id": user_id,
+            "updated": updated_ids,
+            "not_found": [item_id for item_id in requested_ids if item_id not in updated],
+            "updated_at": updated_at
+        })
+        
+    except Exception as e:
+        logger.exception("❌ Error updating %s selection", plural)
+        return jsonify({
+            "success": False,
+            "error": f"Failed to update {plural} selection: {str(e)}"
+        }), 500
+
+@app.route('/api/v2/topics/select-batch', methods=['POST'])
+def batch_topic_selection():
+    """Set selection for many trending topics of the authenticated user at once"""
+    return _batch_update_selection('trending_topics', 'topic_id', 'topic')
+
+@app.route('/api/v2/opportunities/select-batch', methods=['POST'])
+def batch_opportunity_selection():
+    """Set selection for many content opportunities of the authenticated user at once"""
+    return _batch_update_selection('content_opportunities', 'opportunity_id', 'opportunity')
+
 # ============================================================================
 # HEALTH AND STATUS ENDPOINTS
 # ============================================================================
 
-@app.route('/api/v2/health', methods=['GET'])
-def enhanced_health_check():
-    """Enhanced health check with system status"""
+# Liveness probes hit the health check every few seconds; reuse the Supabase probe briefly
+_HEALTH_PROBE_TTL = 5.0
+_health_probe = (float('-inf'), False, None)  # (monotonic time, healthy, error)
+
+def _probe_supabase():
+    """Supabase health as (healthy, error), re-checked at most every _HEALTH_PROBE_TTL seconds"""
+    global _health_probe
+    checked_at, healthy, error = _health_probe
+    if time.monotonic() - checked_at < _HEALTH_PROBE_TTL:
+        return healthy, error
+    
     try:
         # Test Supabase connection
-        supabase_storage = ImprovedSupabaseStorage()
+        supabase_storage = _get_storage()
         test_query = supabase_storage._execute_query('GET', 'trend_analyses?limit=1')
-        supabase_healthy = test_query['success']
-        supabase_error = test_query.get('error') if not supabase_healthy else None
+        healthy = test_query['success']
+        error = test_query.get('error') if not healthy else None
     except Exception as e:
-        supabase_healthy = False
-        supabase_error = str(e)
+        healthy = False
+        error = str(e)
+    
+    _health_probe = (time.monotonic(), healthy, error)
+    return healthy, error
+
+@app.route('/api/v2/health', methods=['GET'])
+def enhanced_health_check():
+    """Enhanced health check with system status"""
+    supabase_healthy, supabase_error = _probe_supabase()
     
     # Check environment variables
     env_check = {
@@ -927,7 +1543,7 @@ def enhanced_health_check():
     
     health_status = {
         "status": "healthy" if supabase_healthy else "degraded",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _now_iso(),
         "api_version": "v2_enhanced_rls",
         "components": {
             "supabase": {
@@ -980,6 +1596,8 @@ def index():
             "GET /api/v2/trend-analysis/<id>/opportunities": "Get content opportunities for user",
             "PATCH /api/v2/topics/<id>/select": "Toggle topic selection for user",
             "PATCH /api/v2/opportunities/<id>/select": "Toggle opportunity selection for user",
+            "POST /api/v2/topics/select-batch": "Set selection for many topics at once",
+            "POST /api/v2/opportunities/select-batch": "Set selection for many opportunities at once",
             "GET /api/v2/health": "Enhanced health check"
         },
         "usage": {
@@ -1004,7 +1622,7 @@ def basic_health():
     return jsonify({
         "status": "healthy",
         "server": "enhanced_noodl_integration_rls",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _now_iso(),
         "rls_enabled": True
     })
 
@@ -1018,7 +1636,7 @@ async def generate_blog_ideas_endpoint(analysis_id):
     CORRECTED: Phase 2 blog idea generation with optional Linkup integration
     """
     try:
-        print(f"📡 Received blog idea generation request for analysis: {analysis_id}")
+        logger.info("📡 Received blog idea generation request for analysis: %s", analysis_id)
         
         # Get request data
         data = request.get_json()
@@ -1034,9 +1652,7 @@ async def generate_blog_ideas_endpoint(analysis_id):
             return jsonify(error_response), status_code
         
         # Validate analysis_id
-        try:
-            uuid.UUID(analysis_id)
-        except ValueError:
+        if not _is_valid_uuid(analysis_id):
             return jsonify({
                 "success": False,
                 "error": "Invalid analysis_id format. Must be a valid UUID."
@@ -1044,11 +1660,10 @@ async def generate_blog_ideas_endpoint(analysis_id):
         
         # CORRECTED: Extract Linkup API key (OPTIONAL parameter)
         linkup_api_key = data.get('linkup_api_key')  # This should be optional
-        print(f"🔍 Linkup API KEY: {linkup_api_key}")
         linkup_enabled = bool(linkup_api_key)
         
         if linkup_enabled:
-            print(f"🔍 Linkup research enabled for analysis: {analysis_id}")
+            logger.info("🔍 Linkup research enabled for analysis: %s", analysis_id)
         
         # REMOVED: Don't require Linkup key - it should be optional
         # The original code incorrectly required the Linkup key
@@ -1062,29 +1677,31 @@ async def generate_blog_ideas_endpoint(analysis_id):
             }), 400
         
         # Validate LLM provider (unchanged)
-        supported_providers = ['openai', 'anthropic', 'deepseek', 'gemini', 'kimi']
         provider = llm_config.get('provider', 'openai').lower()
-        if provider not in supported_providers:
+        if provider not in _SUPPORTED_PROVIDERS:
             return jsonify({
                 "success": False,
-                "error": f"Unsupported LLM provider: {provider}. Supported: {supported_providers}"
+                "error": f"Unsupported LLM provider: {provider}. {_SUPPORTED_PROVIDERS_MSG}"
             }), 400
         
-        print(f"🎯 Generating blog ideas for analysis: {analysis_id}")
-        print(f"👤 User ID: {user_id}")
-        print(f"🤖 LLM Provider: {provider}")
-        print(f"🔗 Linkup Enabled: {linkup_enabled}")
+        logger.info("🎯 Generating blog ideas for analysis: %s, user: %s, provider: %s, linkup: %s",
+                    analysis_id, user_id, provider, linkup_enabled)
         
         # Optional generation configuration
         generation_config = data.get('generation_config', {})
         
-        # Initialize blog idea generation engine
-        engine = BlogIdeaGenerationEngine()
+        # An identical earlier request is answered from cache unless the client asks for a fresh run
+        cache_key = None
+        if not data.get('force_regenerate'):
+            cache_key = _blog_generation_cache_key(analysis_id, user_id, llm_config, generation_config, linkup_enabled)
+        result = _get_cached_blog_generation(cache_key)
+        cache_hit = result is not None
         
-        # Initialize Phase 2 storage
-        phase2_storage = Phase2SupabaseStorage()
+        # Shared engine and Phase 2 storage; neither keeps per-request state
+        engine = _get_blog_engine()
+        phase2_storage = _get_phase2_storage()
         
-        print("🚀 Starting blog idea generation...")
+        logger.info("🚀 Starting blog idea generation...")
         
         # Run the generation with timeout handling
         async def run_generation():
@@ -1102,54 +1719,54 @@ async def generate_blog_ideas_endpoint(analysis_id):
                 )
                 
                 # Save results to Supabase
-                print(f"💾 Saving blog generation results to Supabase...")
+                logger.info("💾 Saving blog generation results to Supabase...")
                 generation_result_id = await phase2_storage.save_blog_generation_results(
                     analysis_id=analysis_id,
                     user_id=user_id,
                     generation_result=result,
                     llm_config=llm_config
                 )
+                _invalidate_blog_reads(user_id)
                 
                 # Add storage metadata to result
                 result['storage_metadata'] = {
                     'generation_result_id': generation_result_id,
                     'supabase_saved': True,
-                    'phase2_storage_timestamp': datetime.now().isoformat()
+                    'phase2_storage_timestamp': _now_iso()
                 }
                 
-                print(f"✅ Blog idea generation completed: {len(result.get('blog_ideas', []))} ideas generated")
+                logger.info("✅ Blog idea generation completed: %d ideas generated", len(result.get('blog_ideas', [])))
                 return result
                 
             except asyncio.TimeoutError:
-                print("❌ Blog idea generation timed out after 4 minutes")
-                raise Exception("Blog idea generation timed out. Please try again or reduce the scope.")
+                logger.error("❌ Blog idea generation timed out after 4 minutes")
+                raise AnalysisTimeoutError("Blog idea generation timed out. Please try again or reduce the scope.")
             except Exception as e:
-                print(f"❌ Blog idea generation failed: {e}")
+                logger.error("❌ Blog idea generation failed: %s", e)
                 raise
         
-        # Execute async generation with proper event loop handling
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # Use nest_asyncio to handle running loop
-                import nest_asyncio
-                nest_asyncio.apply()
-                result = loop.run_until_complete(run_generation())
-            else:
-                result = loop.run_until_complete(run_generation())
-        except RuntimeError as e:
-            if "event loop" in str(e).lower():
-                # Fallback: create new loop if no loop exists
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    result = loop.run_until_complete(run_generation())
-                finally:
-                    loop.close()
-            else:
+        inflight, owner = _join_inflight_generation(cache_key) if cache_key and not cache_hit else (None, True)
+        coalesced = not owner
+        
+        if cache_hit:
+            logger.info("♻️ Reusing cached blog generation for analysis: %s", analysis_id)
+        elif coalesced:
+            logger.info("♻️ Waiting for identical in-flight blog generation for analysis: %s", analysis_id)
+            result = copy.deepcopy(await asyncio.wrap_future(inflight))
+        elif inflight is None:
+            # The view is a coroutine, so the generation runs on the request's own event loop
+            result = await run_generation()
+        else:
+            try:
+                result = await run_generation()
+                # Cache before settling so requests arriving afterwards hit the cache
+                _cache_blog_generation(cache_key, result)
+            except BaseException as e:
+                _settle_inflight_generation(cache_key, inflight, error=e)
                 raise
+            _settle_inflight_generation(cache_key, inflight, result=result)
         
-        print("✅ Blog idea generation completed successfully")
+        logger.info("✅ Blog idea generation completed successfully")
         
         # ENHANCED: Add Linkup info to response metadata
         response_data = {
@@ -1162,7 +1779,7 @@ async def generate_blog_ideas_endpoint(analysis_id):
                 "average_quality_score": result.get('generation_metadata', {}).get('average_quality_score', 0),
                 "processing_time_seconds": result.get('generation_metadata', {}).get('processing_time_seconds', 0),
                 "llm_provider": provider,
-                "generation_timestamp": datetime.now().isoformat(),
+                "generation_timestamp": _now_iso(),
                 "phase2_version": "v1.0",
                 "storage_saved": bool(result.get('storage_metadata', {}).get('supabase_saved')),
                 "calendar_generated": bool(result.get('content_calendar')),
@@ -1170,15 +1787,11 @@ async def generate_blog_ideas_endpoint(analysis_id):
                 
                 # NEW: Linkup research metadata
                 "linkup_research_enabled": linkup_enabled,
-                "linkup_research_included": bool(result.get('linkup_insights'))
+                "linkup_research_included": bool(result.get('linkup_insights')),
+                "cache_hit": cache_hit,
+                "coalesced": coalesced
             },
-            "quality_metrics": {
-                "excellent_ideas_count": len([i for i in result.get('blog_ideas', []) if i.get('overall_quality_score', 0) >= 80]),
-                "high_quality_ideas_count": len([i for i in result.get('blog_ideas', []) if i.get('overall_quality_score', 0) >= 70]),
-                "format_diversity": len(set(i.get('content_format', '') for i in result.get('blog_ideas', []))),
-                "avg_viral_potential": sum(i.get('viral_potential_score', 0) for i in result.get('blog_ideas', [])) / len(result.get('blog_ideas', [])) if result.get('blog_ideas') else 0,
-                "avg_seo_score": sum(i.get('seo_optimization_score', 0) for i in result.get('blog_ideas', [])) / len(result.get('blog_ideas', [])) if result.get('blog_ideas') else 0
-            }
+            "quality_metrics": _calculate_quality_metrics(result.get('blog_ideas') or [])
         }
         
         # ENHANCED: Add detailed Linkup insights to response if available
@@ -1203,66 +1816,93 @@ async def generate_blog_ideas_endpoint(analysis_id):
         return jsonify(response_data)
         
     except Exception as e:
-        print(f"❌ Blog idea generation error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Blog idea generation error")
         
-        error_response = {
+        return jsonify({
             "success": False,
             "error": f"Blog idea generation failed: {str(e)}",
             "error_type": type(e).__name__,
-            "troubleshooting": {
-                "common_causes": [
-                    "Invalid analysis ID or user access denied",
-                    "Phase 1 analysis not completed or no selections made",
-                    "Invalid or missing LLM API key",
-                    "Linkup API key invalid or rate limited",
-                    "Network connectivity issues"
-                ],
-                "suggested_actions": [
-                    "Verify Phase 1 analysis completed successfully",
-                    "Ensure trending topics and opportunities are selected",
-                    "Check LLM API key is correct and active",
-                    "Verify Linkup API key if using research enhancement",
-                    "Try again with a different LLM provider"
-                ]
-            }
-        }
-        
-        # Determine appropriate HTTP status code
-        if "timeout" in str(e).lower():
-            return jsonify(error_response), 408  # Request Timeout
-        elif "api key" in str(e).lower():
-            return jsonify(error_response), 401  # Unauthorized
-        elif "access denied" in str(e).lower() or "not found" in str(e).lower():
-            return jsonify(error_response), 403  # Forbidden
-        elif "user_id" in str(e).lower() or "uuid" in str(e).lower():
-            return jsonify(error_response), 400  # Bad Request
-        else:
-            return jsonify(error_response), 500  # Internal Server Error
+            "troubleshooting": _BLOG_TROUBLESHOOTING
+        }), _status_for_error(e, _BLOG_ERROR_STATUS_KEYWORDS)
+
+# Seconds between progress events while a streamed generation is running
+_SSE_PROGRESS_INTERVAL = 10
+
+# Streamed generations run on a bounded pool; extra requests wait their turn (and keep
+# getting progress events) instead of each starting a thread and event loop of its own
+_SSE_GENERATION_WORKERS = 8
+_sse_generation_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=_SSE_GENERATION_WORKERS, thread_name_prefix="blog-ideas-stream"
+)
+atexit.register(_sse_generation_executor.shutdown, wait=False, cancel_futures=True)
+
+def _sse_event(event, payload):
+    """Format one Server-Sent Event; payload is a JSON string or a JSON-serializable object"""
+    if not isinstance(payload, str):
+        payload = app.json.dumps(payload)
+    data = "\n".join(f"data: {line}" for line in payload.splitlines())
+    return f"event: {event}\n{data}\n\n"
+
+@app.route('/api/v2/generate-blog-ideas/<analysis_id>/stream', methods=['POST'])
+def stream_blog_ideas_endpoint(analysis_id):
+    """
+    Blog idea generation as Server-Sent Events.
+    
+    Takes the same body as /api/v2/generate-blog-ideas/<analysis_id>. Emits ``started``
+    at once, ``progress`` every few seconds while the generation runs, then ``complete``
+    (or ``error``) carrying the JSON body the non-streaming endpoint would have returned.
+    """
+    # Parse the body now so the generation thread reads the cached copy
+    request.get_json(silent=True)
+    outcome = queue.SimpleQueue()
+    
+    @copy_current_request_context
+    def run_generation():
+        try:
+            outcome.put(app.make_response(_run_async(generate_blog_ideas_endpoint(analysis_id))))
+        except Exception as e:
+            logger.exception("❌ Streamed blog idea generation failed")
+            outcome.put(e)
+        finally:
+            _close_thread_loop()
+    
+    # If the client disconnects the generation still finishes and is cached,
+    # so a retry is answered without another LLM run
+    _sse_generation_executor.submit(run_generation)
+    
+    def events():
+        started = time.monotonic()
+        yield _sse_event("started", {"analysis_id": analysis_id})
+        while True:
+            try:
+                response = outcome.get(timeout=_SSE_PROGRESS_INTERVAL)
+            except queue.Empty:
+                yield _sse_event("progress", {"elapsed_seconds": round(time.monotonic() - started)})
+                continue
+            
+            if isinstance(response, Exception):
+                yield _sse_event("error", {
+                    "success": False,
+                    "error": f"Blog idea generation failed: {str(response)}",
+                    "error_type": type(response).__name__
+                })
+            else:
+                event = "complete" if response.status_code < 400 else "error"
+                yield _sse_event(event, response.get_data(as_text=True))
+            return
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # keep reverse proxies from buffering the stream
+    })
 
 @app.route('/api/v2/blog-ideas/<analysis_id>', methods=['GET'])
+@_cached_blog_read
 def get_blog_ideas_endpoint(analysis_id):
     """Get generated blog ideas with filtering and sorting"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
-        
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
-        
-        # Validate UUIDs
-        try:
-            uuid.UUID(user_id)
-            uuid.UUID(analysis_id)
-        except ValueError:
-            return jsonify({
-                "success": False,
-                "error": "Invalid user_id or analysis_id format. Must be valid UUIDs."
-            }), 400
+        # user_id and the path IDs were validated by _validate_query_user_id
+        user_id = g.user_id
         
         # Extract filters from query parameters
         filters = {}
@@ -1306,19 +1946,10 @@ def get_blog_ideas_endpoint(analysis_id):
                     "error": "limit must be an integer"
                 }), 400
         
-        phase2_storage = Phase2SupabaseStorage()
+        phase2_storage = _get_phase2_storage()
         
         # Get blog ideas with filters
-        async def get_ideas():
-            return await phase2_storage.get_blog_ideas(analysis_id, user_id, filters)
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            blog_ideas = loop.run_until_complete(get_ideas())
-        finally:
-            loop.close()
+        blog_ideas = _run_async(phase2_storage.get_blog_ideas(analysis_id, user_id, filters))
         
         # Enhanced formatting for frontend consumption
         formatted_ideas = []
@@ -1344,17 +1975,11 @@ def get_blog_ideas_endpoint(analysis_id):
             "analysis_id": analysis_id,
             "user_id": user_id,
             "filters_applied": filters,
-            "summary_stats": {
-                "total_ideas": len(formatted_ideas),
-                "selected_count": len([i for i in formatted_ideas if i.get("selected", False)]),
-                "average_quality": round(sum(i.get("overall_quality_score", 0) for i in formatted_ideas) / len(formatted_ideas), 1) if formatted_ideas else 0,
-                "format_breakdown": _calculate_format_breakdown(formatted_ideas),
-                "quality_breakdown": _calculate_quality_breakdown(formatted_ideas)
-            }
+            "summary_stats": _calculate_summary_stats(formatted_ideas)
         })
         
     except Exception as e:
-        print(f"❌ Error getting blog ideas: {e}")
+        logger.exception("❌ Error getting blog ideas")
         return jsonify({
             "success": False,
             "error": f"Failed to get blog ideas: {str(e)}"
@@ -1373,9 +1998,7 @@ def toggle_blog_idea_selection_endpoint(idea_id):
             return jsonify(error_response), status_code
         
         # Validate idea_id
-        try:
-            uuid.UUID(idea_id)
-        except ValueError:
+        if not _is_valid_uuid(idea_id):
             return jsonify({
                 "success": False,
                 "error": "Invalid idea_id format. Must be a valid UUID."
@@ -1394,26 +2017,17 @@ def toggle_blog_idea_selection_endpoint(idea_id):
                 "error": "priority_level must be 'high', 'medium', or 'low'"
             }), 400
         
-        phase2_storage = Phase2SupabaseStorage()
+        phase2_storage = _get_phase2_storage()
         
         # Update blog idea selection
-        async def update_selection():
-            return await phase2_storage.update_blog_idea_selection(
-                idea_id=idea_id,
-                user_id=user_id,
-                selected=selected,
-                priority_level=priority_level,
-                scheduled_date=scheduled_date,
-                notes=notes
-            )
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            success = loop.run_until_complete(update_selection())
-        finally:
-            loop.close()
+        success = _run_async(phase2_storage.update_blog_idea_selection(
+            idea_id=idea_id,
+            user_id=user_id,
+            selected=selected,
+            priority_level=priority_level,
+            scheduled_date=scheduled_date,
+            notes=notes
+        ))
         
         if not success:
             return jsonify({
@@ -1421,6 +2035,8 @@ def toggle_blog_idea_selection_endpoint(idea_id):
                 "error": "Blog idea not found or access denied"
             }), 403
         
+        _invalidate_blog_reads(user_id)
+        
         return jsonify({
             "success": True,
             "idea_id": idea_id,
@@ -1428,11 +2044,11 @@ def toggle_blog_idea_selection_endpoint(idea_id):
             "selected": selected,
             "priority_level": priority_level,
             "scheduled_date": scheduled_date,
-            "updated_at": datetime.now().isoformat()
+            "updated_at": _now_iso()
         })
         
     except Exception as e:
-        print(f"❌ Error updating blog idea selection: {e}")
+        logger.exception("❌ Error updating blog idea selection")
         return jsonify({
             "success": False,
             "error": f"Failed to update blog idea selection: {str(e)}"
@@ -1440,41 +2056,17 @@ def toggle_blog_idea_selection_endpoint(idea_id):
 
 
 @app.route('/api/v2/blog-ideas/<idea_id>', methods=['GET'])
+@_cached_blog_read
 def get_blog_idea_details_endpoint(idea_id):
     """Get detailed information for a specific blog idea"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
-        
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
-        
-        # Validate UUIDs
-        try:
-            uuid.UUID(user_id)
-            uuid.UUID(idea_id)
-        except ValueError:
-            return jsonify({
-                "success": False,
-                "error": "Invalid user_id or idea_id format"
-            }), 400
+        # user_id and the path IDs were validated by _validate_query_user_id
+        user_id = g.user_id
         
-        phase2_storage = Phase2SupabaseStorage()
+        phase2_storage = _get_phase2_storage()
         
         # Get blog idea details
-        async def get_idea():
-            return await phase2_storage.get_blog_idea_by_id(idea_id, user_id)
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            blog_idea = loop.run_until_complete(get_idea())
-        finally:
-            loop.close()
+        blog_idea = _run_async(phase2_storage.get_blog_idea_by_id(idea_id, user_id))
         
         if not blog_idea:
             return jsonify({
@@ -1502,7 +2094,7 @@ def get_blog_idea_details_endpoint(idea_id):
         })
         
     except Exception as e:
-        print(f"❌ Error getting blog idea details: {e}")
+        logger.exception("❌ Error getting blog idea details")
         return jsonify({
             "success": False,
             "error": f"Failed to get blog idea details: {str(e)}"
@@ -1510,43 +2102,24 @@ def get_blog_idea_details_endpoint(idea_id):
 
 
 @app.route('/api/v2/content-calendar/<analysis_id>', methods=['GET'])
+@_cached_blog_read
 def get_content_calendar_endpoint(analysis_id):
     """Get content calendar with scheduling recommendations"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
+        # user_id and the path IDs were validated by _validate_query_user_id
+        user_id = g.user_id
         
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
+        phase2_storage = _get_phase2_storage()
         
-        # Validate UUIDs
-        try:
-            uuid.UUID(user_id)
-            uuid.UUID(analysis_id)
-        except ValueError:
-            return jsonify({
-                "success": False,
-                "error": "Invalid user_id or analysis_id format"
-            }), 400
-        
-        phase2_storage = Phase2SupabaseStorage()
-        
-        # Get content calendar and blog ideas summary
+        # Get content calendar and blog ideas summary. The storage coroutines block on their
+        # HTTP calls, so each runs on a worker thread's loop to overlap the two round trips
         async def get_calendar_data():
-            calendar = await phase2_storage.get_content_calendar(analysis_id, user_id)
-            summary = await phase2_storage.get_blog_ideas_summary(analysis_id, user_id)
-            return calendar, summary
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+            return await asyncio.gather(
+                asyncio.to_thread(_run_async, phase2_storage.get_content_calendar(analysis_id, user_id)),
+                asyncio.to_thread(_run_async, phase2_storage.get_blog_ideas_summary(analysis_id, user_id))
+            )
         
-        try:
-            content_calendar, ideas_summary = loop.run_until_complete(get_calendar_data())
-        finally:
-            loop.close()
+        content_calendar, ideas_summary = _run_async(get_calendar_data())
         
         if not content_calendar:
             return jsonify({
@@ -1577,7 +2150,7 @@ def get_content_calendar_endpoint(analysis_id):
         })
         
     except Exception as e:
-        print(f"❌ Error getting content calendar: {e}")
+        logger.exception("❌ Error getting content calendar")
         return jsonify({
             "success": False,
             "error": f"Failed to get content calendar: {str(e)}"
@@ -1585,41 +2158,17 @@ def get_content_calendar_endpoint(analysis_id):
 
 
 @app.route('/api/v2/strategic-insights/<analysis_id>', methods=['GET'])
+@_cached_blog_read
 def get_strategic_insights_endpoint(analysis_id):
     """Get strategic insights and success predictions"""
     try:
-        # Get user_id from query parameters
-        user_id = request.args.get('user_id')
+        # user_id and the path IDs were validated by _validate_query_user_id
+        user_id = g.user_id
         
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id is required as query parameter"
-            }), 400
-        
-        # Validate UUIDs
-        try:
-            uuid.UUID(user_id)
-            uuid.UUID(analysis_id)
-        except ValueError:
-            return jsonify({
-                "success": False,
-                "error": "Invalid user_id or analysis_id format"
-            }), 400
-        
-        phase2_storage = Phase2SupabaseStorage()
+        phase2_storage = _get_phase2_storage()
         
         # Get strategic insights
-        async def get_insights():
-            return await phase2_storage.get_strategic_insights(analysis_id, user_id)
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            insights = loop.run_until_complete(get_insights())
-        finally:
-            loop.close()
+        insights = _run_async(phase2_storage.get_strategic_insights(analysis_id, user_id))
         
         if not insights:
             return jsonify({
@@ -1644,7 +2193,7 @@ def get_strategic_insights_endpoint(analysis_id):
         })
         
     except Exception as e:
-        print(f"❌ Error getting strategic insights: {e}")
+        logger.exception("❌ Error getting strategic insights")
         return jsonify({
             "success": False,
             "error": f"Failed to get strategic insights: {str(e)}"
@@ -1682,38 +2231,29 @@ def bulk_update_blog_ideas_endpoint():
                     "error": "Each update must include an 'id' field"
                 }), 400
             
-            try:
-                uuid.UUID(update['id'])
-            except ValueError:
+            if not _is_valid_uuid(update['id']):
                 return jsonify({
                     "success": False,
                     "error": f"Invalid idea ID format: {update['id']}"
                 }), 400
         
-        phase2_storage = Phase2SupabaseStorage()
+        phase2_storage = _get_phase2_storage()
         
         # Perform bulk update
-        async def bulk_update():
-            return await phase2_storage.bulk_update_blog_ideas(updates, user_id)
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        updated_count = _run_async(phase2_storage.bulk_update_blog_ideas(updates, user_id))
         
-        try:
-            updated_count = loop.run_until_complete(bulk_update())
-        finally:
-            loop.close()
+        _invalidate_blog_reads(user_id)
         
         return jsonify({
             "success": True,
             "updated_count": updated_count,
             "total_requested": len(updates),
             "user_id": user_id,
-            "updated_at": datetime.now().isoformat()
+            "updated_at": _now_iso()
         })
         
     except Exception as e:
-        print(f"❌ Error in bulk update: {e}")
+        logger.exception("❌ Error in bulk update")
         return jsonify({
             "success": False,
             "error": f"Bulk update failed: {str(e)}"
@@ -1797,18 +2337,38 @@ def _assess_viral_prediction(viral_score: int) -> str:
         return "Low viral potential"
 
 
-def _calculate_format_breakdown(ideas: List[Dict]) -> Dict[str, int]:
-    """Calculate format breakdown"""
-    breakdown = {}
+def _calculate_quality_metrics(ideas: List[Dict]) -> Dict[str, Any]:
+    """Quality metrics for a generation result, gathered in one pass over the ideas"""
+    excellent = high_quality = 0
+    formats = set()
+    viral_total = seo_total = 0
+    
     for idea in ideas:
-        fmt = idea.get("content_format", "unknown")
-        breakdown[fmt] = breakdown.get(fmt, 0) + 1
-    return breakdown
+        score = idea.get('overall_quality_score', 0)
+        if score >= 80:
+            excellent += 1
+        if score >= 70:
+            high_quality += 1
+        formats.add(idea.get('content_format', ''))
+        viral_total += idea.get('viral_potential_score', 0)
+        seo_total += idea.get('seo_optimization_score', 0)
+    
+    count = len(ideas)
+    return {
+        "excellent_ideas_count": excellent,
+        "high_quality_ideas_count": high_quality,
+        "format_diversity": len(formats),
+        "avg_viral_potential": viral_total / count if count else 0,
+        "avg_seo_score": seo_total / count if count else 0
+    }
 
 
-def _calculate_quality_breakdown(ideas: List[Dict]) -> Dict[str, int]:
-    """Calculate quality tier breakdown"""
-    breakdown = {
+def _calculate_summary_stats(ideas: List[Dict]) -> Dict[str, Any]:
+    """Summary stats with format and quality tier breakdowns, gathered in one pass"""
+    selected_count = 0
+    quality_total = 0
+    format_breakdown = {}
+    quality_breakdown = {
         "excellent": 0,
         "high_quality": 0,
         "good": 0,
@@ -1817,19 +2377,32 @@ def _calculate_quality_breakdown(ideas: List[Dict]) -> Dict[str, int]:
     }
     
     for idea in ideas:
+        if idea.get("selected", False):
+            selected_count += 1
+        
+        fmt = idea.get("content_format", "unknown")
+        format_breakdown[fmt] = format_breakdown.get(fmt, 0) + 1
+        
         score = idea.get("overall_quality_score", 0)
+        quality_total += score
         if score >= 85:
-            breakdown["excellent"] += 1
+            quality_breakdown["excellent"] += 1
         elif score >= 75:
-            breakdown["high_quality"] += 1
+            quality_breakdown["high_quality"] += 1
         elif score >= 65:
-            breakdown["good"] += 1
+            quality_breakdown["good"] += 1
         elif score >= 55:
-            breakdown["decent"] += 1
+            quality_breakdown["decent"] += 1
         else:
-            breakdown["needs_work"] += 1
+            quality_breakdown["needs_work"] += 1
     
-    return breakdown
+    return {
+        "total_ideas": len(ideas),
+        "selected_count": selected_count,
+        "average_quality": round(quality_total / len(ideas), 1) if ideas else 0,
+        "format_breakdown": format_breakdown,
+        "quality_breakdown": quality_breakdown
+    }
 
 
 def _generate_seo_analysis(blog_idea: Dict) -> Dict[str, Any]:
@@ -1890,6 +2463,33 @@ def _generate_business_analysis(blog_idea: Dict) -> Dict[str, Any]:
     }
 
 
+# Parts of the implementation guide that are the same for every idea; built once and
+# shared (read-only) by every response
+_CONTENT_CREATION_STEPS = (
+    "Research and gather additional sources",
+    "Create detailed outline from provided structure",
+    "Write compelling introduction with hook",
+    "Develop main content sections",
+    "Add visual elements and examples",
+    "Optimize for SEO keywords",
+    "Write strong conclusion with CTA",
+    "Review and edit for quality"
+)
+_REQUIRED_RESOURCES = (
+    "Keyword research tool",
+    "Image/graphic creation tool",
+    "Content management system",
+    "SEO optimization plugin"
+)
+_SUCCESS_METRICS = (
+    "Organic traffic growth",
+    "Social media shares",
+    "Time on page",
+    "Conversion rate",
+    "Backlink acquisition"
+)
+
+
 def _generate_implementation_guide(blog_idea: Dict) -> Dict[str, Any]:
     """Generate implementation guide"""
     word_count = blog_idea.get("estimated_word_count", 2500)
@@ -1897,16 +2497,7 @@ def _generate_implementation_guide(blog_idea: Dict) -> Dict[str, Any]:
     total_hours = writing_hours + 5  # Add research, editing, SEO time
     
     return {
-        "content_creation_steps": [
-            "Research and gather additional sources",
-            "Create detailed outline from provided structure",
-            "Write compelling introduction with hook",
-            "Develop main content sections",
-            "Add visual elements and examples",
-            "Optimize for SEO keywords",
-            "Write strong conclusion with CTA",
-            "Review and edit for quality"
-        ],
+        "content_creation_steps": _CONTENT_CREATION_STEPS,
         "estimated_timeline": {
             "research_hours": 2,
             "writing_hours": round(writing_hours, 1),
@@ -1914,19 +2505,8 @@ def _generate_implementation_guide(blog_idea: Dict) -> Dict[str, Any]:
             "seo_optimization_hours": 1,
             "total_estimated_hours": round(total_hours, 1)
         },
-        "required_resources": [
-            "Keyword research tool",
-            "Image/graphic creation tool",
-            "Content management system",
-            "SEO optimization plugin"
-        ],
-        "success_metrics": [
-            "Organic traffic growth",
-            "Social media shares",
-            "Time on page",
-            "Conversion rate",
-            "Backlink acquisition"
-        ]
+        "required_resources": _REQUIRED_RESOURCES,
+        "success_metrics": _SUCCESS_METRICS
     }
 
 
@@ -2015,34 +2595,39 @@ def _calculate_resource_allocation(calendar: Dict, summary: Dict) -> Dict[str, A
     }
 
 
+# Milestones don't depend on the calendar yet, so they are built once; responses get
+# their own copy of each dict (the deliverables are tuples, so shallow copies suffice)
+_MILESTONES = (
+    {
+        "milestone": "Phase 1: Content Creation Setup",
+        "timeline": "Week 1",
+        "deliverables": ("Content templates", "SEO guidelines", "Publishing schedule"),
+        "success_criteria": "All tools and processes in place"
+    },
+    {
+        "milestone": "Phase 2: Initial Content Batch",
+        "timeline": "Weeks 2-4",
+        "deliverables": ("First 6-8 blog posts", "Social media promotion plan"),
+        "success_criteria": "Consistent publishing rhythm established"
+    },
+    {
+        "milestone": "Phase 3: Optimization & Scaling",
+        "timeline": "Weeks 5-8",
+        "deliverables": ("Performance analytics", "Content optimization", "Team scaling"),
+        "success_criteria": "Measurable traffic and engagement growth"
+    },
+    {
+        "milestone": "Phase 4: Results & Iteration",
+        "timeline": "Weeks 9-12",
+        "deliverables": ("ROI analysis", "Content strategy refinement", "Future planning"),
+        "success_criteria": "Proven content system with positive ROI"
+    }
+)
+
+
 def _generate_milestone_tracking(calendar: Dict) -> List[Dict[str, Any]]:
     """Generate milestone tracking"""
-    return [
-        {
-            "milestone": "Phase 1: Content Creation Setup",
-            "timeline": "Week 1",
-            "deliverables": ["Content templates", "SEO guidelines", "Publishing schedule"],
-            "success_criteria": "All tools and processes in place"
-        },
-        {
-            "milestone": "Phase 2: Initial Content Batch",
-            "timeline": "Weeks 2-4",
-            "deliverables": ["First 6-8 blog posts", "Social media promotion plan"],
-            "success_criteria": "Consistent publishing rhythm established"
-        },
-        {
-            "milestone": "Phase 3: Optimization & Scaling",
-            "timeline": "Weeks 5-8",
-            "deliverables": ["Performance analytics", "Content optimization", "Team scaling"],
-            "success_criteria": "Measurable traffic and engagement growth"
-        },
-        {
-            "milestone": "Phase 4: Results & Iteration",
-            "timeline": "Weeks 9-12",
-            "deliverables": ["ROI analysis", "Content strategy refinement", "Future planning"],
-            "success_criteria": "Proven content system with positive ROI"
-        }
-    ]
+    return [dict(milestone) for milestone in _MILESTONES]
 
 
 def _generate_actionable_recommendations(insights: Dict) -> List[Dict[str, Any]]:
@@ -2453,9 +3038,7 @@ def get_keyword_csv_template_fixed(tool_name: str):
             }), 500
         
     except Exception as e:
-        print(f"❌ Unexpected error in template endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Unexpected error in template endpoint")
         
         return jsonify({
             "success": False,
@@ -2850,6 +3433,7 @@ def enhance_blog_ideas_with_keywords_fixed():
             try:
                 print(f"📡 Sending bulk update to Supabase...")
                 updated_count = loop.run_until_complete(phase2_storage.bulk_update_blog_ideas(updates, user_id))
+                _invalidate_blog_reads(user_id)
                 print(f"✅ Bulk update completed: {updated_count} ideas updated")
             except Exception as e:
                 print(f"❌ Bulk update failed: {e}")
@@ -2902,9 +3486,7 @@ def enhance_blog_ideas_with_keywords_fixed():
         })
         
     except Exception as e:
-        logger.error(f"❌ Error enhancing blog ideas with keywords: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error enhancing blog ideas with keywords")
         
         return jsonify({
             "success": False,
@@ -3768,9 +4350,7 @@ def export_keyword_analysis_final(analysis_id):
             }), 500
         
     except Exception as e:
-        print(f"❌ Unexpected error in export endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Unexpected error in export endpoint")
         
         return jsonify({
             "success": False,
@@ -4234,7 +4814,7 @@ import os
 def affiliate_research_endpoint():
     """Linkup-based affiliate research endpoint"""
     try:
-        from linkup_affiliate_research import linkup_affiliate_research
+        from linkup_affiliate_research import get_linkup_affiliate_research
         from supabase_affiliate_storage import affiliate_storage
         
         data = request.get_json()
@@ -4269,8 +4849,13 @@ def affiliate_research_endpoint():
         
         # Run research asynchronously
         async def run_research():
-            from linkup_affiliate_research import linkup_affiliate_research
-            research_data = await linkup_affiliate_research.search_affiliate_programs(topic, subtopics)
+            from linkup_affiliate_research import get_linkup_affiliate_research
+            linkup_affiliate_research = get_linkup_affiliate_research()
+            try:
+                research_data = await linkup_affiliate_research.search_affiliate_programs(topic, subtopics)
+            finally:
+                # The pooled session belongs to this request's event loop
+                await linkup_affiliate_research.close()
             
             # Store in Supabase if user_id provided
             if user_id and user_id != "test-user-123":
@@ -4340,8 +4925,13 @@ def validate_affiliate_profitability():
             }), 400
         
         async def run_validation():
-            from linkup_affiliate_research import linkup_affiliate_research
-            research_data = await linkup_affiliate_research.search_affiliate_programs(topic, subtopics=[topic])
+            from linkup_affiliate_research import get_linkup_affiliate_research
+            linkup_affiliate_research = get_linkup_affiliate_research()
+            try:
+                research_data = await linkup_affiliate_research.search_affiliate_programs(topic, subtopics=[topic])
+            finally:
+                # The pooled session belongs to this request's event loop
+                await linkup_affiliate_research.close()
             
             analysis = research_data['profitability_analysis']
             return {
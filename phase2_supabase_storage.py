@@ -14,15 +14,44 @@ from typing import Dict, Any, List, Optional
 # Import Phase 1 storage system
 from working_supabase_integration import RLSSupabaseStorage
 
+# Blog idea fields bulk_update_blog_ideas may change; keep in sync with
+# bulk_update_blog_ideas_function.sql
+_BULK_UPDATEABLE_FIELDS = (
+    "selected", "priority_level", "scheduled_publish_date",
+    "notes", "title", "description",
+    # CRITICAL: Allow updating scores
+    "overall_quality_score", "viral_potential_score", "seo_optimization_score",
+    "audience_alignment_score", "content_feasibility_score", "business_impact_score",
+    
+    # CRITICAL FIX: Add ALL keyword enhancement fields
+    "keyword_research_enhanced",
+    "traffic_potential_score",
+    "competition_score",
+    "enhanced_primary_keywords",
+    "enhanced_secondary_keywords",
+    "keyword_research_data",
+    "keyword_suggestions",
+    "content_optimization_tips",
+    "keyword_source_tools",
+    "enhancement_timestamp"
+)
+
 class Phase2SupabaseStorage(RLSSupabaseStorage):
     """Enhanced storage system for Phase 2 blog idea generation results"""
     
+    # Set once the Phase 2 tables have been checked in this process
+    _phase2_tables_checked = False
+    # Cleared when the bulk_update_blog_ideas RPC turns out not to exist
+    _bulk_update_rpc_available = True
+    
     def __init__(self, user_id: Optional[str] = None):
         super().__init__(user_id)
         self.logger = logging.getLogger(__name__)
         
-        # Ensure Phase 2 tables exist
-        self._ensure_phase2_tables()
+        # Ensure Phase 2 tables exist (three round trips, so only for the first instance)
+        if not Phase2SupabaseStorage._phase2_tables_checked:
+            Phase2SupabaseStorage._phase2_tables_checked = True
+            self._ensure_phase2_tables()
     
     def _ensure_phase2_tables(self):
         """Ensure Phase 2 tables exist in Supabase"""
@@ -973,62 +1002,49 @@ class Phase2SupabaseStorage(RLSSupabaseStorage):
         idea_updates: List[Dict[str, Any]],
         user_id: str
     ) -> int:
-        """Bulk update multiple blog ideas"""
+        """Bulk update multiple blog ideas
+        
+        Uses the bulk_update_blog_ideas RPC (bulk_update_blog_ideas_function.sql), which
+        applies every update in one statement, and falls back to one PATCH per idea when
+        the function hasn't been created.
+        """
         
         self.set_user_context(user_id)
         
         try:
-            updated_count = 0
+            updated_at = datetime.utcnow().isoformat()
             
+            # One patch per idea; repeated ids merge in order, as sequential PATCHes would
+            patches = {}
             for update in idea_updates:
                 idea_id = update.get("id")
                 if not idea_id:
                     continue
-                
-                update_data = {
-                    "updated_at": datetime.utcnow().isoformat()
-                }
-                
-                # Add fields that can be updated
-                updateable_fields = [
-                "selected", "priority_level", "scheduled_publish_date", 
-                    "notes", "title", "description",
-                    # CRITICAL: Allow updating scores
-                    "overall_quality_score", "viral_potential_score", "seo_optimization_score",
-                    "audience_alignment_score", "content_feasibility_score", "business_impact_score",
-                    
-                    # CRITICAL FIX: Add ALL keyword enhancement fields
-                    "keyword_research_enhanced",
-                    "traffic_potential_score", 
-                    "competition_score",
-                    "enhanced_primary_keywords",
-                    "enhanced_secondary_keywords", 
-                    "keyword_research_data",
-                    "keyword_suggestions",
-                    "content_optimization_tips",
-                    "keyword_source_tools",
-                    "enhancement_timestamp"
-                ]
-                print(f"🔧 DEBUG: bulk_update_blog_ideas called")
-                print(f"   User ID: {user_id}")
-                print(f"   Number of updates: {len(idea_updates)}")
-
-                if idea_updates:
-                    sample = idea_updates[0]
-                    print(f"   Sample update:")
-                    print(f"      ID: {sample.get('id', 'NO ID')}")
-                    print(f"      Enhanced flag: {sample.get('keyword_research_enhanced', 'NOT SET')}")
-                    print(f"      Traffic score: {sample.get('traffic_potential_score', 'NOT SET')}")
-                    print(f"      Primary keywords: {sample.get('enhanced_primary_keywords', 'NOT SET')}")
-                    print(f"      Update keys: {list(sample.keys())}")
-
-                
-                for field in updateable_fields:
-                    if field in update:
-                        update_data[field] = update[field]
-                        print(f"🔧 Updating idea {idea_id} with data: {update_data}")
-
-                
+                patch = patches.setdefault(idea_id, {"updated_at": updated_at})
+                patch.update((field, update[field]) for field in _BULK_UPDATEABLE_FIELDS if field in update)
+            
+            self.logger.debug(f"🔧 bulk_update_blog_ideas: {len(patches)} ideas for user {user_id}")
+            
+            if not patches:
+                return 0
+            
+            if Phase2SupabaseStorage._bulk_update_rpc_available:
+                result = self._execute_query('POST', 'rpc/bulk_update_blog_ideas', {
+                    "p_user_id": user_id,
+                    "p_updates": [{"id": idea_id, **patch} for idea_id, patch in patches.items()]
+                })
+                if result['success']:
+                    updated_count = len(result['data'])
+                    self.logger.info(f"✅ Bulk updated {updated_count} blog ideas")
+                    return updated_count
+                if result.get('status_code') != 404:
+                    raise Exception(f"Bulk update RPC failed: {result.get('error')}")
+                Phase2SupabaseStorage._bulk_update_rpc_available = False
+                self.logger.warning("⚠️ bulk_update_blog_ideas function not found, updating ideas one by one "
+                                    "(apply bulk_update_blog_ideas_function.sql to enable it)")
+            
+            updated_count = 0
+            for idea_id, update_data in patches.items():
                 result = self._execute_query(
                     'PATCH',
                     f'blog_ideas?id=eq.{idea_id}&user_id=eq.{user_id}',
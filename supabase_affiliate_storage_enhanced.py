@@ -16,8 +16,6 @@ import json
 # Import the working pattern
 from working_supabase_integration import RLSSupabaseStorage
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class EnhancedSupabaseAffiliateStorage(RLSSupabaseStorage):
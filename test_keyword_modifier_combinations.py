@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test for modifier combination selection in KeywordModifierEnhancer
+Pins which combinations _generate_modifier_combinations returns for a fixed keyword:
+global top-N by estimated volume, ties in generation order
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from keyword_modifier_enhancer import KeywordModifierEnhancer
+
+# Top combinations for "home security" with max_combinations=1 (one per category)
+EXPECTED_HOME_SECURITY_TOP = [
+    ("home security optimization", "problem_solving", 170),
+    ("enterprise home security control-panel", "security_tools", 161),
+    ("enterprise home security mobile-app", "security_tools", 161),
+    ("enterprise home security web-interface", "security_tools", 161),
+    ("enterprise home security dashboard", "security_tools", 161),
+    ("enterprise home security monitoring-station", "security_tools", 161),
+    ("enterprise home security alert-system", "security_tools", 161),
+    ("enterprise home security sensor-network", "security_tools", 161),
+    ("enterprise home security camera-setup", "security_tools", 161),
+]
+
+def _reference_combinations(enhancer, base_keyword, max_combinations):
+    """Every pattern in generation order, stably sorted by the full-string volume estimate"""
+    clean_keyword = base_keyword.strip()
+    candidates = [
+        (template.format(b=clean_keyword, m=modifier), category_name)
+        for category_name, modifier, intent, use_case in enhancer._flat_modifiers
+        for template in enhancer._PATTERN_TEMPLATES
+    ]
+    ranked = sorted(candidates, key=lambda c: enhancer._estimate_volume(c[0]), reverse=True)
+    return ranked[:max_combinations * enhancer._num_categories]
+
+def test_top_combinations_for_fixed_keyword():
+    """The selection for a known keyword doesn't drift"""
+    enhancer = KeywordModifierEnhancer()
+    combinations = enhancer._generate_modifier_combinations("home security", 1)
+
+    actual = [
+        (c["enhanced_keyword"], c["modifier_category"], c["estimated_search_volume"])
+        for c in combinations
+    ]
+    print(f"  top combinations: {actual[:3]} ...")
+    assert actual == EXPECTED_HOME_SECURITY_TOP
+
+def test_volume_matches_full_string_estimate():
+    """max(template, base, modifier) multipliers give the same volume as scoring the whole string"""
+    enhancer = KeywordModifierEnhancer()
+    for keyword in ("home security", "  enterprise software ", "best budget laptop for students"):
+        for combination in enhancer._generate_modifier_combinations(keyword, 5):
+            expected = enhancer._estimate_volume(combination["enhanced_keyword"])
+            assert combination["estimated_search_volume"] == expected, combination
+
+def test_selection_and_tie_order():
+    """Global top-N by volume; equal volumes keep generation order"""
+    enhancer = KeywordModifierEnhancer()
+    for keyword, max_combinations in (("home security", 1), ("home security", 3), ("enterprise software", 2)):
+        actual = [
+            (c["enhanced_keyword"], c["modifier_category"])
+            for c in enhancer._generate_modifier_combinations(keyword, max_combinations)
+        ]
+        assert actual == _reference_combinations(enhancer, keyword, max_combinations), keyword
+
+def main():
+    """Run the checks as a script"""
+
+    print("🧪 Testing modifier combination selection")
+    print("=" * 50)
+
+    for check in (test_top_combinations_for_fixed_keyword,
+                  test_volume_matches_full_string_estimate,
+                  test_selection_and_tie_order):
+        check()
+        print(f"✅ {check.__name__}")
+
+    print("\n✅ All modifier combination checks passed")
+
+if __name__ == "__main__":
+    main()
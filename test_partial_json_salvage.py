@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test for the timeout-salvage parser in fixed_trend_research
+_extract_partial_json_items must recover every complete object from a truncated JSON array
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixed_trend_research import TrendResearchIntegration
+
+def _salvage(response):
+    integration = TrendResearchIntegration({})
+    return integration._extract_partial_json_items(response)
+
+def test_truncated_array():
+    """Complete objects are kept; the cut-off tail is dropped"""
+    response = '[{"trend_name": "A", "viral_potential": 80}, {"trend_name": "B", "viral_potential": 70}, {"trend_na'
+    items = _salvage(response)
+    print(f"  truncated array -> {items}")
+    assert items == [
+        {"trend_name": "A", "viral_potential": 80},
+        {"trend_name": "B", "viral_potential": 70},
+    ]
+
+def test_brackets_inside_strings():
+    """Brackets and braces inside string values don't end an object early"""
+    response = (
+        '[{"trend_name": "Arrays [like] this", "description": "uses {braces} and ] too"},\n'
+        ' {"trend_name": "Nested", "keywords": ["a", "b]"], "meta": {"x": "}"}},\n'
+        ' {"trend_name": "cut", "keywords": ["c'
+    )
+    items = _salvage(response)
+    print(f"  brackets in strings -> {items}")
+    assert items == [
+        {"trend_name": "Arrays [like] this", "description": "uses {braces} and ] too"},
+        {"trend_name": "Nested", "keywords": ["a", "b]"], "meta": {"x": "}"}},
+    ]
+
+def test_fenced_json_prefix():
+    """A ```json fence (and any prose) before the array is skipped"""
+    response = 'Here are the trends:\n```json\n[\n  {"trend_name": "A"},\n  {"trend_name": "B"},\n  {"trend_'
+    items = _salvage(response)
+    print(f"  fenced prefix -> {items}")
+    assert items == [{"trend_name": "A"}, {"trend_name": "B"}]
+
+def test_no_array():
+    """Nothing to salvage without an opening bracket"""
+    assert _salvage('{"trend_name": "A"') == []
+
+def main():
+    """Run the checks as a script"""
+
+    print("🧪 Testing partial JSON salvage")
+    print("=" * 50)
+
+    for check in (test_truncated_array,
+                  test_brackets_inside_strings,
+                  test_fenced_json_prefix,
+                  test_no_array):
+        check()
+        print(f"✅ {check.__name__}")
+
+    print("\n✅ All partial JSON salvage checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+-- Enriched trending topics view for GET /api/v2/trend-analysis/<id>/topics
+-- Run this in Supabase SQL editor
+
+-- Computes the endpoint's derived fields in Postgres so PostgREST returns
+-- the formatted rows directly. Formulas mirror _calculate_topic_opportunity_score
+-- and _get_topic_priority_level in main.py; keep them in sync.
+-- security_invoker makes the view apply the caller's RLS policies on trending_topics.
+CREATE OR REPLACE VIEW trending_topics_enriched
+WITH (security_invoker = true) AS
+SELECT
+    t.id,
+    t.trend_analysis_id,
+    t.title,
+    t.viral_potential,
+    t.keywords,
+    t.search_volume,
+    t.competition,
+    t.selected,
+    t.additional_data,
+    t.created_at,
+    t.user_id,
+    ROUND(
+        t.viral_potential * 0.4
+        + (CASE t.search_volume WHEN 'High' THEN 30 WHEN 'Medium' THEN 20 WHEN 'Low' THEN 10 ELSE 20 END) * 0.3
+        + (CASE t.competition WHEN 'Low' THEN 30 WHEN 'Medium' THEN 20 WHEN 'High' THEN 10 ELSE 20 END) * 0.3
+    )::INTEGER AS opportunity_score,
+    (t.viral_potential >= 80) AS is_high_potential,
+    (t.viral_potential >= 60 AND t.competition = 'Low') AS is_quick_win,
+    CASE
+        WHEN t.viral_potential >= 80 THEN 'High'
+        WHEN t.viral_potential >= 60 THEN 'Medium'
+        ELSE 'Low'
+    END AS priority_level,
+    -- Appended last: CREATE OR REPLACE VIEW can only add columns at the end
+    t.updated_at
+FROM trending_topics t;
+
+GRANT SELECT ON trending_topics_enriched TO anon, authenticated, service_role;
+
+-- Lets the planner serve high-potential filters from an index
+CREATE INDEX IF NOT EXISTS idx_trending_topics_analysis_viral
+ON trending_topics (trend_analysis_id, viral_potential DESC);
+
+SELECT 'trending_topics_enriched view created' as status;
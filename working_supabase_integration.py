@@ -7,9 +7,10 @@ Bypasses Supabase 2.16.0 http_client issue while supporting Row Level Security
 import os
 import json
 import logging
+import threading
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add this method to your working_supabase_integration.py class:
 
@@ -178,10 +179,41 @@ async def save_trend_analysis_results(
         self.logger.error(f"❌ Failed to save trend analysis: {e}")
         raise
 
+# One pooled HTTP session per Supabase project, shared by every storage instance so
+# requests reuse warm keep-alive connections instead of a new TCP/TLS handshake each time
+_POOL_MAXSIZE = 32
+_shared_sessions: Dict[Tuple[str, str], Any] = {}
+_shared_sessions_lock = threading.Lock()
+# Supabase URLs whose connection test has already run in this process
+_tested_urls = set()
+
+def _get_shared_session(supabase_url: str, supabase_key: str):
+    """Return the shared requests.Session for a Supabase project, creating it on first use"""
+    key = (supabase_url, supabase_key)
+    session = _shared_sessions.get(key)
+    if session is None:
+        with _shared_sessions_lock:
+            session = _shared_sessions.get(key)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.headers.update({
+                    'apikey': supabase_key,
+                    'Authorization': f'Bearer {supabase_key}',
+                    'Content-Type': 'application/json',
+                    'Prefer': 'return=representation'
+                })
+                adapter = HTTPAdapter(pool_maxsize=_POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _shared_sessions[key] = session
+    return session
+
 class RLSSupabaseStorage:
     """Supabase storage with Row Level Security support that bypasses 2.16.0 issues"""
     
-    def __init__(self, user_id: Optional[str] = None):
+    def __init__(self, user_id: Optional[str] = None, session=None):
         print("*****RLSSupabaseStorage - RLS Compatible with HTTP Workaround******")
         
         # Get credentials
@@ -194,22 +226,18 @@ class RLSSupabaseStorage:
         self.logger = logging.getLogger(__name__)
         self.current_user_id = user_id
         
-        # Setup HTTP session (bypasses Supabase client issues)
-        import requests
-        self.session = requests.Session()
-        self.session.headers.update({
-            'apikey': self.SUPABASE_KEY,
-            'Authorization': f'Bearer {self.SUPABASE_KEY}',
-            'Content-Type': 'application/json',
-            'Prefer': 'return=representation'
-        })
+        # Setup HTTP session (bypasses Supabase client issues); pooled and shared across instances
+        self.session = session or _get_shared_session(self.SUPABASE_URL, self.SUPABASE_KEY)
         
         # Base URL for REST API
         self.rest_url = f"{self.SUPABASE_URL}/rest/v1"
         
         self.logger.info("✅ RLS Supabase client initialized (HTTP-based workaround)")
         
-        # Test connection
+        # Test connection, once per project; storages are created per request in places
+        if self.SUPABASE_URL in _tested_urls:
+            return
+        _tested_urls.add(self.SUPABASE_URL)
         try:
             response = self.session.get(f"{self.rest_url}/trend_analyses?limit=1")
             if response.status_code in [200, 206]:
@@ -291,9 +319,14 @@ class RLSSupabaseStorage:
         user_id: str,  # Now required for RLS
         topic: str = "",
         target_audience: str = "",
-        focus_area: str = ""
+        focus_area: str = "",
+        metadata: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Save complete trend analysis results with RLS"""
+        """Save complete trend analysis results with RLS
+        
+        ``metadata`` is merged over the result's own metadata before the record is
+        inserted, so callers can attach extra fields without a follow-up PATCH.
+        """
         
         if not user_id:
             raise ValueError("user_id is required for RLS")
@@ -304,13 +337,17 @@ class RLSSupabaseStorage:
         try:
             self.logger.info(f"💾 Saving trend analysis results for user {user_id}, topic: {topic}")
             
+            record_metadata = trend_result.get('metadata', {})
+            if metadata:
+                record_metadata = {**record_metadata, **metadata}
+            
             # Step 1: Create main trend analysis record
             trend_analysis_id = await self._create_trend_analysis_record_rls(
                 user_id=user_id,
                 topic=topic,
                 target_audience=target_audience,
                 focus_area=focus_area,
-                metadata=trend_result.get('metadata', {})
+                metadata=record_metadata
             )
             
             # Step 2: Save trending topics
@@ -594,6 +631,50 @@ class RLSSupabaseStorage:
             self.logger.error(f"Error retrieving trend analysis: {e}")
             raise
 
+    def get_trend_analysis_summary(self, trend_analysis_id: str, user_id: str) -> Dict[str, Any]:
+        """Counts and flags for a trend analysis without downloading its topic and opportunity rows
+        
+        One request: PostgREST counts the child tables server-side through embedded
+        ``table(count)`` resources, and only the small PyTrends fields are read from metadata.
+        """
+        
+        self.set_user_context(user_id)
+        
+        count_tables = ('trending_topics', 'content_opportunities', 'keyword_intelligence')
+        result = self._execute_query(
+            'GET',
+            f'trend_analyses?id=eq.{trend_analysis_id}&user_id=eq.{user_id}'
+            f'&select=id,topic,created_at,confidence_score:metadata->confidence_score,'
+            f'pytrends_timestamp:metadata->pytrends_analysis->analysis_timestamp,'
+            f'pytrends_enhanced:metadata->pytrends_enhanced,'
+            f'actionable_insights:metadata->pytrends_analysis->actionable_insights,'
+            + ','.join(f'{table}(count)' for table in count_tables)
+            + ''.join(f'&{table}.user_id=eq.{user_id}' for table in count_tables)
+        )
+        
+        if not result['success']:
+            raise Exception(f"Failed to get trend analysis: {result.get('error')}")
+        
+        if not result['data']:
+            raise Exception(f"Trend analysis {trend_analysis_id} not found or access denied")
+        
+        analysis = result['data'][0]
+        # Embedded counts come back as [{"count": n}]
+        counts = {table: (analysis.get(table) or [{}])[0].get('count', 0) for table in count_tables}
+        
+        return {
+            "trend_analysis_id": trend_analysis_id,
+            "topic": analysis.get('topic'),
+            "created_at": analysis.get('created_at'),
+            "confidence_score": analysis.get('confidence_score') or 0,
+            "has_pytrends_data": analysis.get('pytrends_timestamp') is not None,
+            "pytrends_enhanced": bool(analysis.get('pytrends_enhanced')),
+            "actionable_insights_count": len(analysis.get('actionable_insights') or []),
+            "trending_topics_count": counts['trending_topics'],
+            "content_opportunities_count": counts['content_opportunities'],
+            "keyword_intelligence_count": counts['keyword_intelligence']
+        }
+
     def get_all_trend_analyses(self, limit: int = 20, user_id: str = None) -> List[Dict[str, Any]]:
         """Get trend analyses filtered by user"""
         try: